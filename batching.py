@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+import logging
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Largest number of requests folded into one generate call
+BATCH_SIZE = 16
+# How long the worker waits for more requests after the first one arrives
+BATCH_TIMEOUT_MS = 20
+# Upper bound a caller waits for its result before giving up
+REQUEST_TIMEOUT_S = 120
+
+
+class _PendingRequest:
+    """A queued request with the slot and event its caller waits on"""
+
+    __slots__ = ("text", "model_name", "result", "event")
+
+    def __init__(self, text: str, model_name: Optional[str]):
+        self.text = text
+        self.model_name = model_name
+        self.result: Tuple[str, Optional[str]] = ("", None)
+        self.event = threading.Event()
+
+
+class BatchingPool:
+    """Collects concurrent paraphrase requests and runs them as batches"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[str], Optional[str]], List[Tuple[str, Optional[str]]]],
+        batch_size: int = BATCH_SIZE,
+        batch_timeout_ms: int = BATCH_TIMEOUT_MS,
+        preferred_key: Optional[Callable[[], Optional[str]]] = None
+    ):
+        """
+        Args:
+            batch_fn: Called as batch_fn(texts, model_name), returns one (text, error) per input
+            batch_size: Maximum number of requests per batch
+            batch_timeout_ms: Time window for accumulating a batch
+            preferred_key: Returns the model whose group should run first, e.g. the loaded one
+        """
+        self.batch_fn = batch_fn
+        self.preferred_key = preferred_key
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout_ms / 1000
+        self.queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Start the background worker thread if it isn't running yet"""
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self.worker, name="batching-pool", daemon=True)
+                self._worker.start()
+        return self
+
+    def submit(self, text: str, model_name: str = None, timeout: float = REQUEST_TIMEOUT_S) -> Tuple[str, Optional[str]]:
+        """
+        Queue a text and block until its batch has been processed
+
+        Args:
+            text: Text to paraphrase
+            model_name: Paraphrasing model, None for the current one
+            timeout: Seconds to wait for the result
+
+        Returns:
+            Tuple of (paraphrased_text, error)
+        """
+        self.start()
+        pending = _PendingRequest(text, model_name)
+        self.queue.put(pending)
+
+        if not pending.event.wait(timeout):
+            return "", f"Paraphrasing timed out after {timeout}s"
+        return pending.result
+
+    def _drain(self) -> List[_PendingRequest]:
+        """Block for one request, then gather more until the batch fills or the window closes"""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.batch_timeout
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def worker(self):
+        """Worker loop: drain, group by model, run each group, scatter results"""
+        while True:
+            batch = self._drain()
+
+            groups = {}
+            for pending in batch:
+                groups.setdefault(pending.model_name, []).append(pending)
+
+            # Run the already-loaded model's group first to save a model swap
+            if self.preferred_key is not None and len(groups) > 1:
+                preferred = self.preferred_key()
+                if preferred in groups:
+                    groups = {preferred: groups.pop(preferred), **groups}
+
+            for name, group in groups.items():
+                try:
+                    results = self.batch_fn([pending.text for pending in group], name)
+                except Exception as e:
+                    logger.exception("Error in batch worker: %s", e)
+                    results = [("", str(e))] * len(group)
+
+                for pending, result in zip(group, results):
+                    pending.result = result
+                    pending.event.set()
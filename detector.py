@@ -1,21 +1,244 @@
+import os
+import re
+import math
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import numpy as np
-from typing import Dict, List, Optional, Tuple
+from importlib.util import find_spec
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
-import requests
-import json
+
+# Let the Rust tokenizers parallelize batched encoding
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+# Nothing in this module trains; catch any forward that escapes inference_mode
+torch.set_grad_enabled(False)
+
+# ONNX Runtime backend with fallback. Only probe for the packages here; optimum
+# pulls in transformers, so it is imported when an ONNX model is first loaded.
+ONNX_AVAILABLE = find_spec("optimum") is not None and find_spec("onnxruntime") is not None
+
+# BetterTransformer fastpath for encoders without native SDPA support
+BETTERTRANSFORMER_AVAILABLE = find_spec("optimum") is not None
+
+# bitsandbytes int8 weights for CUDA inference
+BITSANDBYTES_AVAILABLE = find_spec("bitsandbytes") is not None
+
+# Maximum number of texts per batched forward pass
+BATCH_SIZE = 16
+
+# Truncation length for tokenizers that don't declare model_max_length
+DEFAULT_MAX_LENGTH = 512
+
+# Declared lengths above this are transformers' "unset" sentinel
+MAX_DECLARED_LENGTH = 100_000
+
+# Texts are cut to max_length * this many characters before tokenizing, so
+# long inputs aren't fully tokenized only to be truncated. Generous enough
+# that the cut never lands inside the first max_length tokens in practice
+MAX_CHARS_PER_TOKEN = 10
+
+# Texts shorter than this (stripped, in characters) are too short to score
+MIN_TEXT_LENGTH = 20
+
+# Number of segments built and scored at a time when streaming a document
+SEGMENT_CHUNK_SIZE = 64
+
+# Segments shorter than this (stripped, in characters) are skipped
+MIN_SEGMENT_LENGTH = 50
+
+# Number of ensemble results memoized per detector
+ENSEMBLE_CACHE_SIZE = 1024
+
+# Number of per-model (ai, human) scores memoized per detector
+SCORE_CACHE_SIZE = 8192
+
+# AI-text detectors: short name -> HuggingFace model id
+DETECTOR_MODELS = {
+    "roberta-base-openai-detector": "roberta-base-openai-detector",
+    "roberta-large-openai-detector": "roberta-large-openai-detector",
+    "chatgpt-detector": "hello-simpleai/chatgpt-detector-roberta",
+    "mixed-detector": "andreas122001/roberta-mixed-detector"
+}
+
+# Distilled detector for the "fast" method, e.g. a DistilRoBERTa fine-tuned for
+# AI-text detection; set DISTIL_DETECTOR_MODEL to its HuggingFace id to enable
+DISTIL_DETECTOR_MODEL = os.environ.get("DISTIL_DETECTOR_MODEL")
+if DISTIL_DETECTOR_MODEL:
+    DETECTOR_MODELS["distil-detector"] = DISTIL_DETECTOR_MODEL
+
+# Used by the "fast" method when no distilled detector is configured or loadable
+FAST_FALLBACK_MODEL = "roberta-base-openai-detector"
+
+# Detector order for detect_top_n_models, best first for each criterion
+MODEL_RANKINGS = {
+    "performance": [
+        "mixed-detector",
+        "roberta-large-openai-detector",
+        "chatgpt-detector",
+        "roberta-base-openai-detector"
+    ],
+    "speed": [
+        "roberta-base-openai-detector",
+        "chatgpt-detector",
+        "mixed-detector",
+        "roberta-large-openai-detector"
+    ],
+    "accuracy": [
+        "mixed-detector",
+        "roberta-large-openai-detector",
+        "chatgpt-detector",
+        "roberta-base-openai-detector"
+    ]
+}
+# A configured distilled detector is the fastest option
+if DISTIL_DETECTOR_MODEL:
+    MODEL_RANKINGS["speed"].insert(0, "distil-detector")
+
+# Classifiers for other tasks (language ID, sentiment, topic). They are not
+# AI detectors, so they are only used when selected explicitly.
+AUXILIARY_MODELS = {
+    "multilingual-detector": "papluca/xlm-roberta-base-language-detection",
+    "distilbert-detector": "distilbert-base-uncased-finetuned-sst-2-english",
+    "bert-detector": "textattack/bert-base-uncased-ag-news"
+}
+
+# Models used by ensemble detection when none are requested
+DEFAULT_ENSEMBLE = ["chatgpt-detector", "mixed-detector"]
+
+# Early exit: stop the ensemble after this many models when their mean AI
+# probability is further than the margin from 0.5 with a std below the limit
+EARLY_EXIT_MIN_MODELS = 2
+EARLY_EXIT_MARGIN = 0.4
+EARLY_EXIT_STD = 0.05
+
+# Padded sequence lengths of the CUDA graphs captured for single-text inference
+GRAPH_SEQ_LENS = (64, 128)
+
+# Serializes CUDA graph capture across models loaded in parallel by warmup
+_GRAPH_CAPTURE_LOCK = threading.Lock()
+
+# Sentence bodies between terminal punctuation
+_SENTENCE_RE = re.compile(r'[^.!?]+')
+
+def _sentence_spans(text: str, min_length: int = 11) -> List[Tuple[int, int]]:
+    """
+    Character spans of the sentences in text, stripped of surrounding
+    whitespace and without their terminal punctuation. Sentences shorter than
+    min_length characters are skipped.
+    """
+    spans = []
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group()
+        stripped = sentence.strip()
+        if len(stripped) >= min_length:
+            start = match.start() + (len(sentence) - len(sentence.lstrip()))
+            spans.append((start, start + len(stripped)))
+    return spans
+
+def _text_digest(text: str) -> bytes:
+    """Fixed-size digest of a text, so long inputs don't become cache keys."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class _RunningStats:
+    """
+    One-pass (Welford) mean and population standard deviation, so ensemble and
+    segment statistics are accumulated without building intermediate arrays.
+    """
+    __slots__ = ("n", "mean", "m2")
+    
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def push(self, value: float) -> None:
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+    
+    @property
+    def std(self) -> float:
+        return (self.m2 / self.n) ** 0.5 if self.n else 0.0
+
+
+def _running_stats() -> _RunningStats:
+    """Create an empty running mean/std accumulator."""
+    return _RunningStats()
+
 
 class AITextDetector:
     """
     A utility class for detecting AI-generated text using multiple open source models.
     """
     
-    def __init__(self):
+    def __init__(self, backend: str = "torch", enable_trt: bool = False,
+                 dtype: Optional[torch.dtype] = None, compile: bool = True,
+                 load_in_8bit: bool = False):
+        """
+        Args:
+            backend: Default inference backend, "torch" or "onnx"
+            enable_trt: Use the TensorRT execution provider (FP16) for the onnx backend
+            dtype: Model weight dtype. If None, BF16/FP16 on CUDA and FP32 on CPU.
+            compile: Compile CUDA models with torch.compile (PyTorch 2.0+) on load
+            load_in_8bit: Load CUDA models with bitsandbytes int8 weights. CPU models
+                are always dynamically quantized to int8.
+        """
         self.models = {}
         self.tokenizers = {}
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer_keys = {}
+        self.max_len = {}
+        self.graphs = {}
+        self.streams = {}
+        self._ensemble_cache = OrderedDict()
+        self._ensemble_cache_lock = threading.Lock()
+        self._score_cache = OrderedDict()
+        self._score_cache_lock = threading.Lock()
+        self._cache_counts = {'ensemble_hits': 0, 'ensemble_misses': 0, 'score_hits': 0, 'score_misses': 0}
+        # One lock per model so concurrent requests load it once while
+        # warmup() still loads different models in parallel; models stay in
+        # _loading until fully prepared
+        self._load_locks = {}
+        self._load_locks_lock = threading.Lock()
+        self._loading = set()
+        self.backend = backend
+        self.enable_trt = enable_trt
+        self._requested_dtype = dtype
+        self.compile = compile
+        self.load_in_8bit = load_in_8bit
         self.logger = self._setup_logger()
+
+    @functools.cached_property
+    def device(self) -> torch.device:
+        """Inference device, resolved on first use so constructing a detector doesn't touch CUDA."""
+        return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    @functools.cached_property
+    def dtype(self) -> torch.dtype:
+        """Model weight dtype; resolving it also applies the per-device backend settings."""
+        if self.device.type == "cuda":
+            # TF32 tensor cores for any matmul still running in FP32
+            torch.set_float32_matmul_precision("high")
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.backends.cuda.enable_flash_sdp(True)
+            torch.backends.cuda.enable_mem_efficient_sdp(True)
+        else:
+            # Use every core for intra-op parallelism on the CPU fallback
+            torch.set_num_threads(os.cpu_count() or 1)
+        
+        if self._requested_dtype is not None:
+            return self._requested_dtype
+        
+        # Half precision on CUDA: BF16 where supported (Ampere+), FP16 otherwise
+        if self.device.type == "cuda":
+            return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        return torch.float32
         
     def _setup_logger(self) -> logging.Logger:
         """Setup logging for the detector."""
@@ -28,7 +251,7 @@ class AITextDetector:
             logger.addHandler(handler)
         return logger
     
-    def load_model(self, model_name: str = "roberta-base-openai-detector") -> bool:
+    def load_model(self, model_name: str = "roberta-base-openai-detector", backend: Optional[str] = None) -> bool:
         """
         Load a specific AI detection model.
         
@@ -41,84 +264,581 @@ class AITextDetector:
                 - "AI4Bharat/IndicBERTv2-MLM-only": Good for multilingual detection
                 - "microsoft/DialoGPT-medium": Dialog-specific detection
                 - "unitary/toxic-bert": Can help identify AI patterns
+            backend: "torch" or "onnx". If None, uses the detector's default backend.
         
         Returns:
             bool: True if model loaded successfully, False otherwise
         """
+        if model_name in self.models and model_name not in self._loading:
+            return True
+        
+        with self._load_locks_lock:
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+        
+        with load_lock:
+            if model_name in self.models and model_name not in self._loading:
+                return True
+            self._loading.add(model_name)
+            try:
+                return self._load_model(model_name, backend)
+            finally:
+                self._loading.discard(model_name)
+    
+    def _load_model(self, model_name: str, backend: Optional[str]) -> bool:
+        """Load a model with its load lock held; see load_model"""
         try:
-            model_map = {
-                "roberta-base-openai-detector": "roberta-base-openai-detector",
-                "roberta-large-openai-detector": "roberta-large-openai-detector", 
-                "chatgpt-detector": "hello-simpleai/chatgpt-detector-roberta",
-                "mixed-detector": "andreas122001/roberta-mixed-detector",
-                "multilingual-detector": "papluca/xlm-roberta-base-language-detection",
-                "distilbert-detector": "distilbert-base-uncased-finetuned-sst-2-english",
-                "bert-detector": "textattack/bert-base-uncased-ag-news"
-            }
+            model_map = {**DETECTOR_MODELS, **AUXILIARY_MODELS}
             
             hf_model_name = model_map.get(model_name, model_name)
             
             self.logger.info(f"Loading model: {hf_model_name}")
             
-            self.tokenizers[model_name] = AutoTokenizer.from_pretrained(hf_model_name)
-            self.models[model_name] = AutoModelForSequenceClassification.from_pretrained(hf_model_name)
-            self.models[model_name].to(self.device)
-            self.models[model_name].eval()
+            backend = backend or self.backend
+            if backend == "onnx":
+                return self._load_onnx_model(model_name, hf_model_name)
+
+            # Deferred so importing this module stays cheap
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+            self.tokenizers[model_name] = AutoTokenizer.from_pretrained(hf_model_name, use_fast=True)
+            self.max_len[model_name] = self._model_max_length(model_name)
+            self._tokenizer_key(model_name)
+            
+            # Load weights straight into the target dtype instead of FP32 then casting,
+            # with fused scaled-dot-product attention where the architecture supports it.
+            # The model is prepared in a local and published to self.models last:
+            # the inference paths only check membership there before running it
+            load_kwargs = {"torch_dtype": self.dtype}
+            quantized_8bit = self._int8_load_kwargs(load_kwargs)
+            try:
+                model = AutoModelForSequenceClassification.from_pretrained(
+                    hf_model_name,
+                    attn_implementation="sdpa",
+                    **load_kwargs
+                )
+            except ValueError:
+                self.logger.info(f"SDPA attention not supported for {hf_model_name}, using default attention")
+                model = AutoModelForSequenceClassification.from_pretrained(
+                    hf_model_name,
+                    **load_kwargs
+                )
+                model = self._to_bettertransformer(model_name, model)
+            if not quantized_8bit:
+                # bitsandbytes models are already placed by their device_map
+                model.to(self.device)
+            model.eval()
+
+            # int8 dynamic quantization of the Linear layers for FP32 CPU inference
+            if self.device.type == "cpu" and self.dtype == torch.float32:
+                model = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+            # Dedicated stream so ensemble members can run concurrently
+            if self.device.type == "cuda":
+                self.streams[model_name] = torch.cuda.Stream()
+            
+            # bitsandbytes int8 kernels are neither compilable nor graph-capturable
+            if self.compile and self.device.type == "cuda" and hasattr(torch, "compile") and not quantized_8bit:
+                model = self._compile_model(model_name, model)
             
+            # reduce-overhead compilation already replays CUDA graphs; capture our
+            # own only for models left in eager mode
+            if self.device.type == "cuda" and isinstance(model, torch.nn.Module) \
+                    and not hasattr(model, "_orig_mod") and not quantized_8bit:
+                self._capture_graph(model_name, model)
+            
+            self.models[model_name] = model
             self.logger.info(f"Successfully loaded model: {model_name}")
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to load model {model_name}: {str(e)}")
+            # Don't leave a half-prepared model behind for the next caller
+            for state in (self.models, self.tokenizers, self.tokenizer_keys, self.max_len, self.graphs, self.streams):
+                state.pop(model_name, None)
             return False
     
-    def detect_single_model(self, text: str, model_name: str) -> Dict[str, float]:
+    def _int8_load_kwargs(self, load_kwargs: Dict) -> bool:
+        """
+        Add bitsandbytes LLM.int8() loading options to from_pretrained kwargs
+        when load_in_8bit was requested on CUDA.
+        
+        Returns:
+            bool: True if the model will be loaded with int8 weights
+        """
+        if not self.load_in_8bit or self.device.type != "cuda":
+            return False
+        
+        if not BITSANDBYTES_AVAILABLE:
+            self.logger.warning("load_in_8bit requires bitsandbytes. Install with: pip install bitsandbytes")
+            return False
+        
+        from transformers import BitsAndBytesConfig
+        load_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+        load_kwargs["device_map"] = {"": self.device.index or 0}
+        return True
+
+    def _to_bettertransformer(self, model_name: str, model):
+        """
+        Swap in optimum's BetterTransformer fused encoder layers for a model
+        that couldn't be loaded with SDPA attention. Returns the model unchanged
+        if optimum is missing or the architecture isn't supported.
+        """
+        if not BETTERTRANSFORMER_AVAILABLE:
+            return model
+        
+        try:
+            from optimum.bettertransformer import BetterTransformer
+            model = BetterTransformer.transform(model)
+            self.logger.info(f"Using BetterTransformer fastpath for {model_name}")
+        except Exception as e:
+            self.logger.info(f"BetterTransformer not applied to {model_name}: {str(e)}")
+        return model
+
+    def warmup(self, model_names: List[str]) -> Dict[str, bool]:
+        """
+        Load several models concurrently. Loading is I/O bound (downloads and
+        safetensors reads release the GIL), so threads overlap the loads.
+        
+        Args:
+            model_names: Names of the models to load
+            
+        Returns:
+            Dict with model names and their loading status
+        """
+        missing = [name for name in dict.fromkeys(model_names) if name not in self.models]
+        if not missing:
+            return {name: True for name in model_names}
+        
+        # Resolve the deferred transformers import before fanning out; its lazy
+        # module is not safe to initialize from several threads at once
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification  # noqa: F401
+        
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            loaded = dict(zip(missing, executor.map(self.load_model, missing)))
+        
+        return {name: loaded.get(name, True) for name in model_names}
+
+    def _load_onnx_model(self, model_name: str, hf_model_name: str) -> bool:
+        """
+        Export a model to ONNX and load it with ONNX Runtime.
+        The ORT model returns logits like the PyTorch model, so the detection
+        methods use it unchanged.
+        """
+        if not ONNX_AVAILABLE:
+            self.logger.error("ONNX backend requires optimum. Install with: pip install optimum[onnxruntime-gpu]")
+            return False
+
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        if self.enable_trt:
+            provider = "TensorrtExecutionProvider"
+            provider_options = {"trt_fp16_enable": True}
+        elif self.device.type == "cuda":
+            provider = "CUDAExecutionProvider"
+            provider_options = None
+        else:
+            provider = "CPUExecutionProvider"
+            provider_options = None
+
+        self.tokenizers[model_name] = AutoTokenizer.from_pretrained(hf_model_name, use_fast=True)
+        self.max_len[model_name] = self._model_max_length(model_name)
+        self._tokenizer_key(model_name)
+        self.models[model_name] = ORTModelForSequenceClassification.from_pretrained(
+            hf_model_name,
+            export=True,
+            provider=provider,
+            provider_options=provider_options
+        )
+
+        self.logger.info(f"Successfully loaded model: {model_name} (onnx, {provider})")
+        return True
+
+    def _compile_model(self, model_name: str, eager_model):
+        """
+        Compile a model with torch.compile (PyTorch 2.0+) and warm it up on a
+        short and a full-length batch so both shapes are specialized.
+        Returns the eager model if compilation fails.
+        """
+        try:
+            compiled = torch.compile(eager_model, mode="reduce-overhead", fullgraph=False)
+            pad_id = self.tokenizers[model_name].pad_token_id or 0
+
+            for batch, seq_len in ((1, 16), (BATCH_SIZE, self.max_len[model_name])):
+                dummy = {
+                    'input_ids': torch.full((batch, seq_len), pad_id, dtype=torch.long, device=self.device),
+                    'attention_mask': torch.ones((batch, seq_len), dtype=torch.long, device=self.device)
+                }
+                self._forward(compiled, dummy)
+
+            self.logger.info(f"Compiled model: {model_name}")
+            return compiled
+
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed for {model_name}, using eager mode: {str(e)}")
+            return eager_model
+
+    def _capture_graph(self, model_name: str, model) -> None:
+        """
+        Capture one CUDA graph per GRAPH_SEQ_LENS bucket of a batch=1 forward
+        pass. Replaying them skips the per-kernel launch overhead that
+        dominates single short-text inference.
+        """
+        pad_id = self.tokenizers[model_name].pad_token_id or 0
+        captured = {}
+        pool = None
+        
+        for seq_len in GRAPH_SEQ_LENS:
+            if seq_len > self.max_len[model_name]:
+                continue
+            try:
+                static_ids = torch.full((1, seq_len), pad_id, dtype=torch.long, device=self.device)
+                static_mask = torch.ones((1, seq_len), dtype=torch.long, device=self.device)
+                static_inputs = {'input_ids': static_ids, 'attention_mask': static_mask}
+                
+                # Warm up on a side stream before capture
+                stream = torch.cuda.Stream()
+                stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(stream):
+                    for _ in range(3):
+                        self._forward(model, static_inputs)
+                torch.cuda.current_stream().wait_stream(stream)
+                
+                # Autocast's weight cache must be disabled while capturing; the
+                # buckets share one memory pool since they never replay together.
+                # Only one capture runs at a time, and thread-local error mode keeps
+                # other threads' eager inference from invalidating it
+                graph = torch.cuda.CUDAGraph()
+                with _GRAPH_CAPTURE_LOCK, \
+                        torch.cuda.graph(graph, pool=pool, capture_error_mode="thread_local"), \
+                        torch.inference_mode(), \
+                        torch.autocast(device_type="cuda", dtype=self.dtype, cache_enabled=False,
+                                       enabled=self.dtype != torch.float32):
+                    static_out = model(**static_inputs).logits.float()
+                pool = graph.pool()
+                
+                captured[seq_len] = (graph, static_ids, static_mask, static_out)
+                
+            except Exception as e:
+                self.logger.warning(f"CUDA graph capture failed for {model_name} (seq_len={seq_len}): {str(e)}")
+        
+        if captured:
+            # One lock per model: the buckets share a memory pool, so replays must not interleave
+            self.graphs[model_name] = (captured, threading.Lock())
+            self.logger.info(f"Captured CUDA graphs for {model_name} (seq_lens={sorted(captured)})")
+        else:
+            self.logger.warning(f"No CUDA graphs captured for {model_name}, using eager mode")
+            self.graphs.pop(model_name, None)
+
+    def _run_model(self, model_name: str, inputs) -> torch.Tensor:
+        """
+        Get logits for tokenized inputs, replaying the smallest captured CUDA
+        graph the input fits in and running eagerly otherwise.
+        """
+        captured = self.graphs.get(model_name)
+        input_ids = inputs['input_ids']
+        seq_len = input_ids.shape[1]
+        
+        if captured is None or input_ids.shape[0] != 1:
+            return self._forward(self.models[model_name], inputs)
+        
+        graphs, lock = captured
+        bucket = next((length for length in sorted(graphs) if length >= seq_len), None)
+        if bucket is None:
+            return self._forward(self.models[model_name], inputs)
+        
+        graph, static_ids, static_mask, static_out = graphs[bucket]
+        pad_id = self.tokenizers[model_name].pad_token_id or 0
+        
+        # The static buffers are shared, so replays must not interleave: always
+        # replay on the model's own stream (ordered after the caller's) and
+        # hold the lock until the GPU has actually finished with the buffers
+        caller_stream = torch.cuda.current_stream()
+        stream = self.streams.get(model_name) or caller_stream
+        with lock, torch.inference_mode():
+            stream.wait_stream(caller_stream)
+            with torch.cuda.stream(stream):
+                static_ids.fill_(pad_id)
+                static_mask.zero_()
+                static_ids[:, :seq_len].copy_(input_ids)
+                static_mask[:, :seq_len].copy_(inputs['attention_mask'])
+                graph.replay()
+                logits = static_out.clone()
+                done = torch.cuda.Event()
+                done.record(stream)
+            done.synchronize()
+        
+        # The clone was allocated on the model stream but is consumed on the caller's
+        logits.record_stream(caller_stream)
+        return logits
+
+    def _to_device(self, inputs, stream: Optional["torch.cuda.Stream"] = None) -> Dict[str, torch.Tensor]:
+        """
+        Move tokenized inputs to the model device. On CUDA the tensors are
+        pinned first so the host-to-device copy can run asynchronously,
+        optionally on a separate copy stream (see _await_copy).
+        """
+        if self.device.type != "cuda":
+            return inputs
+        if stream is None:
+            return {key: value.pin_memory().to(self.device, non_blocking=True) for key, value in inputs.items()}
+        
+        pinned = {key: value.pin_memory() for key, value in inputs.items()}
+        with torch.cuda.stream(stream):
+            return {key: value.to(self.device, non_blocking=True) for key, value in pinned.items()}
+
+    def _await_copy(self, inputs: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        """
+        Make the current stream wait for inputs copied on the copy stream, and
+        mark them as used by it so the allocator doesn't recycle them early.
+        """
+        if self.device.type != "cuda":
+            return inputs
+        current = torch.cuda.current_stream()
+        current.wait_stream(self._copy_stream)
+        for value in inputs.values():
+            value.record_stream(current)
+        return inputs
+
+    @functools.cached_property
+    def _copy_stream(self) -> Optional["torch.cuda.Stream"]:
+        """Side stream for host-to-device input copies on CUDA."""
+        return torch.cuda.Stream() if self.device.type == "cuda" else None
+
+    @functools.cached_property
+    def _preprocess_pool(self) -> ThreadPoolExecutor:
+        """
+        Threads for batch tokenization. The fast tokenizers release the GIL,
+        so one vocabulary group is encoded while another group's model runs.
+        """
+        return ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="detector-preprocess")
+
+    def _forward(self, model, inputs) -> torch.Tensor:
+        """
+        Run a model forward pass for inference and return FP32 logits.
+        On CUDA the matmuls run under autocast in the model's half precision.
+        """
+        with torch.inference_mode():
+            if self.device.type == "cuda" and self.dtype != torch.float32:
+                with torch.autocast(device_type="cuda", dtype=self.dtype):
+                    logits = model(**inputs).logits
+            else:
+                logits = model(**inputs).logits
+        return logits.float()
+
+    def _to_result(self, probs, model_name: str) -> Dict[str, float]:
+        """Convert one row of class probabilities into a detection result dict."""
+        # Most models output [human, ai] probabilities
+        if len(probs) == 2:
+            human_prob = float(probs[0])
+            ai_prob = float(probs[1])
+        else:
+            # Handle edge cases
+            ai_prob = float(probs[0]) if len(probs) == 1 else 0.5
+            human_prob = 1.0 - ai_prob
+        
+        return {
+            'ai_probability': ai_prob,
+            'human_probability': human_prob,
+            'model_used': model_name
+        }
+
+    def _too_short_result(self, model_name: str) -> Dict:
+        """Neutral result for text too short for the detector to be meaningful."""
+        return {
+            'ai_probability': 0.5,
+            'human_probability': 0.5,
+            'model_used': model_name,
+            'note': 'too_short'
+        }
+
+    def _error_result(self, error: Exception) -> Dict:
+        """Neutral result for a model that failed, carrying the error message."""
+        return {
+            'error': str(error),
+            'ai_probability': 0.5,
+            'human_probability': 0.5
+        }
+
+    def _model_max_length(self, model_name: str) -> int:
+        """
+        Maximum input length in tokens for a model, from its tokenizer config.
+        Tokenizers that don't declare one report a huge sentinel; those fall
+        back to DEFAULT_MAX_LENGTH.
+        """
+        max_length = self.tokenizers[model_name].model_max_length
+        if not max_length or max_length > MAX_DECLARED_LENGTH:
+            return DEFAULT_MAX_LENGTH
+        return int(max_length)
+
+    def _clip(self, text: str, model_name: str) -> str:
+        """Cut text to the characters a model can see after truncation."""
+        return text[:self.max_len[model_name] * MAX_CHARS_PER_TOKEN]
+
+    def _tokenizer_key(self, model_name: str) -> int:
+        """
+        Fingerprint of a model's tokenizer (class, input names, special
+        tokens, vocabulary) and truncation length, computed once at load.
+        Models with the same key produce identical inputs and can share them.
+        """
+        if model_name not in self.tokenizer_keys:
+            tokenizer = self.tokenizers[model_name]
+            # Same vocabulary isn't enough: BERT and DistilBERT share one, but
+            # only BERT emits token_type_ids, which DistilBERT's forward rejects
+            self.tokenizer_keys[model_name] = hash((
+                type(tokenizer).__name__,
+                tuple(tokenizer.model_input_names),
+                tuple(tokenizer.all_special_ids),
+                tuple(sorted(tokenizer.get_vocab().items())),
+                self.max_len[model_name]
+            ))
+        return self.tokenizer_keys[model_name]
+
+    def _detect_shared(self, text: str, models: List[str]) -> Dict[str, Dict]:
+        """
+        Run several models on one text. The text is tokenized once per distinct
+        tokenizer vocabulary and the on-device inputs are shared by every model
+        with that vocabulary. On CUDA the independent ensemble members run
+        concurrently, each forward pass enqueued on its model's own stream; on
+        CPU they run one after another, as each forward already uses every core.
+        """
+        results = {}
+        ready = {}
+        pending = {}
+        shared_inputs = {}
+        
+        if len(text.strip()) < MIN_TEXT_LENGTH:
+            return {model_name: self._too_short_result(model_name) for model_name in models}
+        
+        digest = _text_digest(text)
+        for model_name in models:
+            cached = self._cached_scores([(model_name, digest)], model_name)[0]
+            if cached is not None:
+                results[model_name] = cached
+                continue
+            
+            try:
+                if not self.load_model(model_name):
+                    raise ValueError(f"Failed to load model: {model_name}")
+                
+                key = self._tokenizer_key(model_name)
+                if key not in shared_inputs:
+                    shared_inputs[key] = self._to_device(self.tokenizers[model_name](
+                        self._clip(text, model_name),
+                        return_tensors="pt",
+                        truncation=True,
+                        padding=True,
+                        max_length=self.max_len[model_name]
+                    ))
+                ready[model_name] = shared_inputs[key]
+                    
+            except Exception as e:
+                self.logger.error(f"Error with model {model_name}: {str(e)}")
+                results[model_name] = self._error_result(e)
+        
+        if self.device.type == "cuda":
+            events = {}
+            for model_name, inputs in ready.items():
+                stream = self.streams.get(model_name) or torch.cuda.Stream()
+                stream.wait_stream(torch.cuda.current_stream())
+                try:
+                    with torch.cuda.stream(stream):
+                        pending[model_name] = self._run_model(model_name, inputs)
+                        events[model_name] = torch.cuda.Event()
+                        events[model_name].record(stream)
+                except Exception as e:
+                    self.logger.error(f"Error with model {model_name}: {str(e)}")
+                    results[model_name] = self._error_result(e)
+            
+            # Wait for each model's stream before reading its output
+            for event in events.values():
+                event.synchronize()
+        else:
+            # Sequential on CPU: each forward pass already uses all intra-op threads
+            for model_name, inputs in ready.items():
+                try:
+                    pending[model_name] = self._run_model(model_name, inputs)
+                except Exception as e:
+                    self.logger.error(f"Error with model {model_name}: {str(e)}")
+                    results[model_name] = self._error_result(e)
+        
+        # Copy every model's probabilities to the host in one transfer when the
+        # heads agree in size (multi-label models need a copy of their own)
+        if pending:
+            probs_list = [torch.softmax(logits, dim=-1) for logits in pending.values()]
+            if len({probs.shape for probs in probs_list}) == 1:
+                all_probs = torch.cat(probs_list).cpu().tolist()
+            else:
+                all_probs = [probs[0].tolist() for probs in probs_list]
+            for model_name, probs in zip(pending, all_probs):
+                results[model_name] = self._to_result(probs, model_name)
+                self._store_scores((model_name, digest), results[model_name])
+        
+        return {model_name: results[model_name] for model_name in models}
+
+    def detect_single_model(self, text: str, model_name: str, return_logits: bool = False) -> Dict[str, float]:
         """
         Detect AI-generated text using a single model.
         
         Args:
             text: Input text to analyze
             model_name: Name of the model to use
+            return_logits: Skip the softmax and return the raw AI-minus-human logit
+                difference as 'logits_diff' (softmax is monotonic, so
+                ai_probability > t  <=>  logits_diff > log(t / (1 - t)))
             
         Returns:
-            Dict with 'ai_probability' and 'human_probability'
+            Dict with 'ai_probability' and 'human_probability', or 'logits_diff'
+            when return_logits is set
         """
+        # Skip the forward pass entirely for trivially short text
+        if len(text.strip()) < MIN_TEXT_LENGTH:
+            if return_logits:
+                return {'logits_diff': 0.0, 'model_used': model_name, 'note': 'too_short'}
+            return self._too_short_result(model_name)
+        
         if model_name not in self.models:
             if not self.load_model(model_name):
                 raise ValueError(f"Failed to load model: {model_name}")
         
+        cache_key = (model_name, _text_digest(text))
+        if not return_logits:
+            cached = self._cached_scores([cache_key], model_name)[0]
+            if cached is not None:
+                return cached
+        
         try:
+            tokenizer = self.tokenizers[model_name]
+
             # Tokenize the input text
-            inputs = self.tokenizers[model_name](
-                text, 
-                return_tensors="pt", 
-                truncation=True, 
-                padding=True, 
-                max_length=512
-            ).to(self.device)
-            
-            # Get model predictions
-            with torch.no_grad():
-                outputs = self.models[model_name](**inputs)
-                probabilities = torch.softmax(outputs.logits, dim=-1)
-                
-            # Convert to numpy for easier handling
-            probs = probabilities.cpu().numpy()[0]
+            inputs = self._to_device(tokenizer(
+                self._clip(text, model_name),
+                return_tensors="pt",
+                truncation=True,
+                padding=True,
+                max_length=self.max_len[model_name]
+            ))
+
+            # Get model predictions (CUDA graph replay or inference_mode forward)
+            logits = self._run_model(model_name, inputs)
+            if return_logits and logits.shape[-1] == 2:
+                return {
+                    'logits_diff': float(logits[0, 1] - logits[0, 0]),
+                    'model_used': model_name
+                }
             
-            # Most models output [human, ai] probabilities
-            if len(probs) == 2:
-                human_prob = float(probs[0])
-                ai_prob = float(probs[1])
-            else:
-                # Handle edge cases
-                ai_prob = float(probs[0]) if len(probs) == 1 else 0.5
-                human_prob = 1.0 - ai_prob
+            probs = torch.softmax(logits, dim=-1)[0].tolist()
+            result = self._to_result(probs, model_name)
             
-            return {
-                'ai_probability': ai_prob,
-                'human_probability': human_prob,
-                'model_used': model_name
-            }
+            if return_logits:
+                # Models without a [human, ai] head: express the AI probability as a logit
+                ai_prob = min(max(result['ai_probability'], 1e-7), 1.0 - 1e-7)
+                return {'logits_diff': math.log(ai_prob / (1.0 - ai_prob)), 'model_used': model_name}
+            
+            self._store_scores(cache_key, result)
+            return result
             
         except Exception as e:
             self.logger.error(f"Error during detection with {model_name}: {str(e)}")
@@ -128,50 +848,343 @@ class AITextDetector:
                 'model_used': model_name,
                 'error': str(e)
             }
-    
-    def detect_ensemble(self, text: str, models: Optional[List[str]] = None) -> Dict:
+
+    def detect_batch(self, texts: List[str], model_name: str, batch_size: int = BATCH_SIZE,
+                     encodings: Optional[Dict[str, List[List[int]]]] = None,
+                     staged_inputs: Optional[Dict[Tuple[int, ...], Dict[str, torch.Tensor]]] = None) -> List[Dict[str, float]]:
+        """
+        Detect AI-generated text for a batch of texts.
+
+        Texts are sorted by token length and split into buckets of similar
+        length, so each forward pass only pads to the longest text in its bucket.
+
+        Args:
+            texts: List of input texts to analyze
+            model_name: Name of the model to use
+            batch_size: Maximum number of texts per forward pass
+            encodings: Unpadded tokenizer output for texts, if already computed
+                with this model's tokenizer (see _encode_unpadded)
+            staged_inputs: Padded on-device buckets keyed by the text indices they
+                hold, shared with other models in the same tokenizer group; filled
+                in as buckets are staged
+
+        Returns:
+            List of dicts with 'ai_probability' and 'human_probability', one per text
+        """
+        import numpy as np
+
+        if not texts:
+            return []
+
+        if model_name not in self.models:
+            if not self.load_model(model_name):
+                raise ValueError(f"Failed to load model: {model_name}")
+
+        # Serve repeated texts (duplicate lines, boilerplate) from the score
+        # cache and run the model once per distinct uncached text
+        keys = [(model_name, _text_digest(text)) for text in texts]
+        results = self._cached_scores(keys, model_name)
+        misses = {}
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                misses.setdefault(key, []).append(i)
+        if not misses:
+            return results
+
+        try:
+            tokenizer = self.tokenizers[model_name]
+            model = self.models[model_name]
+            miss_idx = [positions[0] for positions in misses.values()]
+
+            # Tokenize once without padding to get the true lengths
+            if encodings is None:
+                encodings = self._encode_unpadded([texts[i] for i in miss_idx], model_name)
+            else:
+                encodings = {key: [encodings[key][i] for i in miss_idx] for key in encodings.keys()}
+            lengths = [len(ids) for ids in encodings['input_ids']]
+            order = np.argsort(lengths, kind="stable")
+
+            buckets = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+            def stage(bucket):
+                bucket_key = tuple(miss_idx[i] for i in bucket)
+                if staged_inputs is not None and bucket_key in staged_inputs:
+                    return staged_inputs[bucket_key]
+                
+                # Pad only up to the longest text in this bucket
+                inputs = self._to_device(tokenizer.pad(
+                    {key: [encodings[key][i] for i in bucket] for key in encodings.keys()},
+                    padding=True,
+                    return_tensors="pt"
+                ), stream=self._copy_stream)
+                if staged_inputs is not None:
+                    staged_inputs[bucket_key] = inputs
+                return inputs
+
+            bucket_probs = []
+            next_inputs = stage(buckets[0])
+            for k in range(len(buckets)):
+                inputs = self._await_copy(next_inputs)
+
+                # Start the next bucket's host-to-device copy so it overlaps this forward
+                if k + 1 < len(buckets):
+                    next_inputs = stage(buckets[k + 1])
+
+                # Softmax stays on the device; no host sync between buckets
+                logits = self._forward(model, inputs)
+                bucket_probs.append(torch.softmax(logits, dim=-1))
+
+            # One device-to-host copy for the whole batch, then undo the length sort
+            sorted_probs = torch.cat(bucket_probs).cpu().tolist()
+            probs = [None] * len(miss_idx)
+            for position, row in zip(order.tolist(), sorted_probs):
+                probs[position] = row
+
+            for (key, positions), row in zip(misses.items(), probs):
+                result = self._to_result(row, model_name)
+                self._store_scores(key, result)
+                for i in positions:
+                    results[i] = dict(result)
+
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error during batch detection with {model_name}: {str(e)}")
+            return [{
+                'ai_probability': 0.5,
+                'human_probability': 0.5,
+                'model_used': model_name,
+                'error': str(e)
+            } for _ in texts]
+
+    def _cached_scores(self, keys: List[Tuple[str, bytes]], model_name: str) -> List[Optional[Dict[str, float]]]:
+        """Look up per-model scores by (model_name, text digest); None for misses."""
+        results = []
+        with self._score_cache_lock:
+            for key in keys:
+                scores = self._score_cache.get(key)
+                if scores is None:
+                    self._cache_counts['score_misses'] += 1
+                    results.append(None)
+                    continue
+                self._cache_counts['score_hits'] += 1
+                self._score_cache.move_to_end(key)
+                results.append({
+                    'ai_probability': scores[0],
+                    'human_probability': scores[1],
+                    'model_used': model_name
+                })
+        return results
+
+    def _store_scores(self, key: Tuple[str, bytes], result: Dict[str, float]) -> None:
+        """Memoize one model's (ai, human) probabilities for a text, evicting the oldest entry."""
+        with self._score_cache_lock:
+            self._score_cache[key] = (result['ai_probability'], result['human_probability'])
+            if len(self._score_cache) > SCORE_CACHE_SIZE:
+                self._score_cache.popitem(last=False)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Sizes and hit/miss counts of the ensemble and per-model score caches."""
+        with self._ensemble_cache_lock, self._score_cache_lock:
+            return {
+                'ensemble_entries': len(self._ensemble_cache),
+                'score_entries': len(self._score_cache),
+                **self._cache_counts
+            }
+
+    def clear_cache(self) -> None:
+        """Drop every memoized detection result and reset the hit/miss counts."""
+        with self._ensemble_cache_lock, self._score_cache_lock:
+            self._ensemble_cache.clear()
+            self._score_cache.clear()
+            for name in self._cache_counts:
+                self._cache_counts[name] = 0
+
+    def _encode_unpadded(self, texts: List[str], model_name: str) -> Dict[str, List[List[int]]]:
+        """Tokenize texts without padding, so batches can be bucketed by true length."""
+        return self.tokenizers[model_name]([self._clip(text, model_name) for text in texts],
+                                           truncation=True, max_length=self.max_len[model_name])
+
+    def _detect_batch_pending(self, texts: List[str], model_name: str, batch_size: int,
+                              encodings: Optional[Future], staged_inputs: Optional[Dict]) -> List[Dict[str, float]]:
+        """detect_batch with the encodings still being computed on the preprocess pool."""
+        return self.detect_batch(texts, model_name, batch_size,
+                                 encodings.result() if encodings is not None else None, staged_inputs)
+
+    def detect_ensemble_batch(self, texts: List[str], models: Optional[List[str]] = None,
+                              batch_size: int = BATCH_SIZE) -> List[Dict]:
+        """
+        Detect AI-generated text for a batch of texts using multiple models.
+        Each model runs batched forward passes over all texts; texts too short
+        to score get a neutral result without touching the models.
+
+        Args:
+            texts: List of input texts to analyze
+            models: List of model names to use. If None, uses default models.
+            batch_size: Maximum number of texts per forward pass
+
+        Returns:
+            List of ensemble result dicts, one per text, shaped like detect_ensemble
+        """
+        import numpy as np
+
+        if models is None:
+            models = DEFAULT_ENSEMBLE
+
+        if not texts:
+            return []
+
+        scored = [i for i, text in enumerate(texts) if len(text.strip()) >= MIN_TEXT_LENGTH]
+        scored_texts = [texts[i] for i in scored]
+        individual = {model_name: [self._too_short_result(model_name) for _ in texts] for model_name in models}
+        valid_models = []
+
+        if scored_texts and any(model_name not in self.models for model_name in models):
+            self.warmup(models)
+
+        # Unpadded encodings shared by all models with the same vocabulary,
+        # and within a tokenizer group, the padded on-device buckets as well.
+        # Each group is tokenized in the background, so later groups encode
+        # while the first group's model is already running
+        shared_encodings = {}
+        shared_staged = {}
+        
+        jobs = {}
+        failed = {}
+        for model_name in models if scored_texts else []:
+            try:
+                encodings = None
+                staged = None
+                if model_name in self.tokenizers:
+                    key = self._tokenizer_key(model_name)
+                    if key not in shared_encodings:
+                        shared_encodings[key] = self._preprocess_pool.submit(self._encode_unpadded, scored_texts, model_name)
+                    encodings = shared_encodings[key]
+                    staged = shared_staged.setdefault(key, {})
+                jobs[model_name] = (encodings, staged)
+            except Exception as e:
+                failed[model_name] = e
+
+        # Models run one after another: on GPU the batched passes already fill
+        # the device, and on CPU each forward pass uses every core's intra-op thread
+        for model_name in models if scored_texts else []:
+            try:
+                if model_name in failed:
+                    raise failed[model_name]
+                batch_results = self._detect_batch_pending(scored_texts, model_name, batch_size, *jobs[model_name])
+
+                if 'error' not in batch_results[0]:
+                    valid_models.append(model_name)
+
+            except Exception as e:
+                self.logger.error(f"Error with model {model_name}: {str(e)}")
+                batch_results = [self._error_result(e) for _ in scored_texts]
+
+            for i, result in zip(scored, batch_results):
+                individual[model_name][i] = result
+
+        # Reduce every scored text across models at once from (models, texts) arrays
+        columns = {i: col for col, i in enumerate(scored)}
+        if valid_models and scored:
+            ai_probs = np.empty((len(valid_models), len(scored)))
+            human_probs = np.empty_like(ai_probs)
+            for row, m in enumerate(valid_models):
+                ai_probs[row] = [individual[m][i]['ai_probability'] for i in scored]
+                human_probs[row] = [individual[m][i]['human_probability'] for i in scored]
+            ai_means = ai_probs.mean(axis=0)
+            human_means = human_probs.mean(axis=0)
+            confidences = 1.0 - ai_probs.std(axis=0)  # Higher std = lower confidence
+        
+        ensemble_results = []
+        for i in range(len(texts)):
+            col = columns.get(i) if valid_models else None
+            if col is not None:
+                ensemble_ai_prob = ai_means[col]
+                ensemble_human_prob = human_means[col]
+                confidence = confidences[col]
+            else:
+                ensemble_ai_prob = 0.5
+                ensemble_human_prob = 0.5
+                confidence = 0.0
+            
+            ensemble_results.append({
+                'ensemble_ai_probability': float(ensemble_ai_prob),
+                'ensemble_human_probability': float(ensemble_human_prob),
+                'confidence': float(max(0.0, confidence)),
+                'prediction': 'AI-generated' if ensemble_ai_prob > 0.5 else 'Human-written',
+                'individual_results': {m: individual[m][i] for m in models},
+                'models_used': models
+            })
+
+        return ensemble_results
+
+    def detect_ensemble(self, text: str, models: Optional[List[str]] = None, early_exit: bool = True) -> Dict:
         """
         Detect AI-generated text using multiple models and ensemble their results.
         
         Args:
             text: Input text to analyze
             models: List of model names to use. If None, uses default models.
+            early_exit: Skip the remaining models once the first EARLY_EXIT_MIN_MODELS
+                agree on a confident verdict (result flagged with 'early_exit')
             
         Returns:
             Dict with ensemble results and individual model results
         """
         if models is None:
-            models = [
-                "chatgpt-detector",
-                "mixed-detector"
-            ]
+            models = DEFAULT_ENSEMBLE
         
-        results = {}
-        ai_probs = []
-        human_probs = []
+        # Key on a digest of the text so long inputs don't become cache keys;
+        # early_exit is part of the key so a truncated first-wave result is
+        # never served to a caller that asked for every model
+        cache_key = (_text_digest(text), tuple(models), early_exit)
+        with self._ensemble_cache_lock:
+            cached = self._ensemble_cache.get(cache_key)
+            if cached is not None:
+                self._cache_counts['ensemble_hits'] += 1
+                self._ensemble_cache.move_to_end(cache_key)
+                return dict(cached)
+            self._cache_counts['ensemble_misses'] += 1
         
-        for model_name in models:
-            try:
-                result = self.detect_single_model(text, model_name)
-                results[model_name] = result
-                
-                if 'error' not in result:
-                    ai_probs.append(result['ai_probability'])
-                    human_probs.append(result['human_probability'])
-                    
-            except Exception as e:
-                self.logger.error(f"Error with model {model_name}: {str(e)}")
-                results[model_name] = {
-                    'error': str(e),
-                    'ai_probability': 0.5,
-                    'human_probability': 0.5
-                }
+        # Load any missing models in parallel before the per-model loop
+        if len(text.strip()) >= MIN_TEXT_LENGTH and any(model_name not in self.models for model_name in models):
+            self.warmup(models)
+        
+        # Run a first wave of models; if they already agree confidently the
+        # rest of the ensemble can't change the verdict much, so skip it
+        first_wave = models[:EARLY_EXIT_MIN_MODELS] if early_exit and len(models) > EARLY_EXIT_MIN_MODELS else models
+        results = self._detect_shared(text, first_wave)
+        
+        ai_stats = _running_stats()
+        human_stats = _running_stats()
+        
+        def accumulate(wave_results):
+            for result in wave_results.values():
+                # Errors and too-short notes carry no signal for the ensemble
+                if 'error' not in result and 'note' not in result:
+                    ai_stats.push(result['ai_probability'])
+                    human_stats.push(result['human_probability'])
+        
+        accumulate(results)
+        exited_early = (
+            len(first_wave) < len(models)
+            and ai_stats.n == len(first_wave)
+            and abs(ai_stats.mean - 0.5) > EARLY_EXIT_MARGIN
+            and ai_stats.std < EARLY_EXIT_STD
+        )
+        if exited_early:
+            models = first_wave
+        elif len(first_wave) < len(models):
+            rest = self._detect_shared(text, models[len(first_wave):])
+            accumulate(rest)
+            results.update(rest)
+        n = ai_stats.n
         
         # Calculate ensemble results
-        if ai_probs:
-            ensemble_ai_prob = np.mean(ai_probs)
-            ensemble_human_prob = np.mean(human_probs)
-            confidence = 1.0 - np.std(ai_probs)  # Higher std = lower confidence
+        if n:
+            ensemble_ai_prob = ai_stats.mean
+            ensemble_human_prob = human_stats.mean
+            confidence = 1.0 - ai_stats.std  # Higher std = lower confidence
         else:
             ensemble_ai_prob = 0.5
             ensemble_human_prob = 0.5
@@ -185,41 +1198,142 @@ class AITextDetector:
             'individual_results': results,
             'models_used': models
         }
+        if exited_early:
+            ensemble_result['early_exit'] = True
         
-        return ensemble_result
+        # Only memoize complete results so failed models are retried next time
+        if n == len(models):
+            with self._ensemble_cache_lock:
+                self._ensemble_cache[cache_key] = ensemble_result
+                if len(self._ensemble_cache) > ENSEMBLE_CACHE_SIZE:
+                    self._ensemble_cache.popitem(last=False)
+        
+        return dict(ensemble_result)
     
-    def analyze_text_segments(self, text: str, segment_length: int = 200) -> Dict:
+    def iter_text_segments(self, text: str, segment_tokens: int = 256, overlap: int = 32,
+                           models: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Yield ensemble results for the text's segments one at a time.
+        Segments are fixed-size token windows, so every segment fills the model
+        input evenly instead of varying with character counts. They are built
+        and scored SEGMENT_CHUNK_SIZE at a time, so only one chunk of segment
+        strings and results is held in memory at once.
+        
+        Args:
+            text: Input text to analyze
+            segment_tokens: Length of each segment in tokens
+            overlap: Number of tokens shared by consecutive segments
+            models: List of model names to use. If None, uses default models.
+            
+        Yields:
+            Ensemble result dict per segment of at least MIN_SEGMENT_LENGTH
+            characters, with 'segment_index' and 'segment_text'
+        """
+        import numpy as np
+
+        if models is None:
+            models = DEFAULT_ENSEMBLE
+        
+        if any(model_name not in self.models for model_name in models):
+            self.warmup(models)
+        
+        # Tokenize the full text once with a representative tokenizer
+        tokenizer = next((self.tokenizers[m] for m in models if m in self.tokenizers), None)
+        if tokenizer is None or not text.strip():
+            return
+        
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = np.asarray(encoding['offset_mapping'], dtype=np.int64).reshape(-1, 2)
+        n_tokens = len(offsets)
+        step = max(1, segment_tokens - overlap)
+        
+        # Window start positions; the last window always adds new tokens
+        starts = np.arange(0, max(n_tokens - overlap, 1), step)
+        ends = np.minimum(starts + segment_tokens, n_tokens) - 1
+        
+        # Map token windows back to character spans of the original text
+        char_starts = offsets[starts, 0].tolist()
+        char_ends = offsets[ends, 1].tolist()
+        
+        for chunk_start in range(0, len(char_starts), SEGMENT_CHUNK_SIZE):
+            spans = zip(char_starts[chunk_start:chunk_start + SEGMENT_CHUNK_SIZE],
+                        char_ends[chunk_start:chunk_start + SEGMENT_CHUNK_SIZE])
+            indexed = [(i, text[start:end]) for i, (start, end) in enumerate(spans, start=chunk_start)]
+            indexed = [(i, segment) for i, segment in indexed if len(segment.strip()) >= MIN_SEGMENT_LENGTH]
+            if not indexed:
+                continue
+            segments = [segment for _, segment in indexed]
+            
+            # Run the chunk's segments through each model in one batch
+            for (i, segment), result in zip(indexed, self.detect_ensemble_batch(segments, models)):
+                result['segment_index'] = i
+                result['segment_text'] = segment[:100] + "..." if len(segment) > 100 else segment
+                yield result
+    
+    def analyze_text_segments_summary(self, text: str, segment_tokens: int = 256, overlap: int = 32,
+                                      models: Optional[List[str]] = None) -> Dict:
+        """
+        Overall statistics of analyze_text_segments without the per-segment
+        results, accumulated in a single pass over iter_text_segments.
+        
+        Args:
+            text: Input text to analyze
+            segment_tokens: Length of each segment in tokens
+            overlap: Number of tokens shared by consecutive segments
+            models: List of model names to use. If None, uses default models.
+            
+        Returns:
+            Dict with overall results
+        """
+        return self._summarize_segments(text, self.iter_text_segments(text, segment_tokens, overlap, models))
+    
+    def analyze_text_segments(self, text: str, segment_tokens: int = 256, overlap: int = 32,
+                              models: Optional[List[str]] = None) -> Dict:
         """
         Analyze text by breaking it into segments for more detailed analysis.
+        See iter_text_segments for how segments are built.
         
         Args:
             text: Input text to analyze
-            segment_length: Length of each segment in characters
+            segment_tokens: Length of each segment in tokens
+            overlap: Number of tokens shared by consecutive segments
+            models: List of model names to use. If None, uses default models.
             
         Returns:
             Dict with segment-wise analysis and overall results
         """
-        # Split text into segments
-        segments = [text[i:i+segment_length] for i in range(0, len(text), segment_length)]
         segment_results = []
-        
-        for i, segment in enumerate(segments):
-            if len(segment.strip()) < 50:  # Skip very short segments
+        summary = self._summarize_segments(
+            text, self.iter_text_segments(text, segment_tokens, overlap, models), segment_results
+        )
+        summary['segment_results'] = segment_results
+        return summary
+    
+    def _summarize_segments(self, text: str, results: Iterator[Dict],
+                            keep: Optional[List[Dict]] = None) -> Dict:
+        """
+        Reduce streamed segment results to overall statistics with running
+        accumulators, appending each result to keep if given.
+        """
+        ai_stats = _running_stats()
+        confidence_stats = _running_stats()
+
+        for result in results:
+            # Neutral placeholders for unscorable text would skew the statistics
+            if all(r.get('note') == 'too_short' for r in result['individual_results'].values()):
                 continue
-                
-            result = self.detect_ensemble(segment)
-            result['segment_index'] = i
-            result['segment_text'] = segment[:100] + "..." if len(segment) > 100 else segment
-            segment_results.append(result)
+            ai_stats.push(result['ensemble_ai_probability'])
+            confidence_stats.push(result['confidence'])
+            if keep is not None:
+                keep.append(result)
         
         # Calculate overall statistics
-        if segment_results:
-            overall_ai_prob = np.mean([r['ensemble_ai_probability'] for r in segment_results])
-            overall_confidence = np.mean([r['confidence'] for r in segment_results])
+        if ai_stats.n:
+            overall_ai_prob = ai_stats.mean
+            overall_confidence = confidence_stats.mean
             
             # Calculate consistency (how similar are the predictions across segments)
-            ai_probs = [r['ensemble_ai_probability'] for r in segment_results]
-            consistency = 1.0 - np.std(ai_probs) if len(ai_probs) > 1 else 1.0
+            consistency = 1.0 - ai_stats.std if ai_stats.n > 1 else 1.0
         else:
             overall_ai_prob = 0.5
             overall_confidence = 0.0
@@ -230,12 +1344,12 @@ class AITextDetector:
             'overall_prediction': 'AI-generated' if overall_ai_prob > 0.5 else 'Human-written',
             'confidence': float(overall_confidence),
             'consistency': float(max(0.0, consistency)),
-            'segment_results': segment_results,
-            'total_segments': len(segment_results),
+            'total_segments': ai_stats.n,
             'text_length': len(text)
         }
     
-    def detect_ai_lines(self, text: str, threshold: float = 0.6, min_line_length: int = 20) -> Dict:
+    def detect_ai_lines(self, text: str, threshold: float = 0.6, min_line_length: int = 20,
+                        batch_size: int = BATCH_SIZE) -> Dict:
         """
         Detect which specific lines in the text are likely AI-generated.
         
@@ -243,6 +1357,7 @@ class AITextDetector:
             text: Input text to analyze
             threshold: Threshold for considering a line AI-generated (0.0 to 1.0)
             min_line_length: Minimum line length to analyze (characters)
+            batch_size: Maximum number of lines per forward pass
             
         Returns:
             Dict with line-by-line analysis results
@@ -252,42 +1367,36 @@ class AITextDetector:
         ai_detected_lines = []
         human_lines = []
         
-        for i, line in enumerate(lines):
-            # Skip empty or very short lines
-            if len(line.strip()) < min_line_length:
-                continue
+        # Collect qualifying lines first so every model scores them in batches
+        stripped = [line.strip() for line in lines]
+        units = [(i, line) for i, line in enumerate(stripped) if len(line) >= min_line_length]
+        batch_results = self.detect_ensemble_batch([line for _, line in units], batch_size=batch_size)
+        
+        for (i, line), result in zip(units, batch_results):
+            ai_prob = result['ensemble_ai_probability']
             
-            try:
-                # Analyze each line
-                result = self.detect_ensemble(line.strip())
-                ai_prob = result['ensemble_ai_probability']
-                
-                line_analysis = {
+            line_analysis = {
+                'line_number': i + 1,
+                'line_text': line,
+                'ai_probability': ai_prob,
+                'is_ai_generated': ai_prob > threshold,
+                'confidence': result['confidence']
+            }
+            
+            line_results.append(line_analysis)
+            
+            if ai_prob > threshold:
+                ai_detected_lines.append({
                     'line_number': i + 1,
-                    'line_text': line.strip(),
-                    'ai_probability': ai_prob,
-                    'is_ai_generated': ai_prob > threshold,
-                    'confidence': result['confidence']
-                }
-                
-                line_results.append(line_analysis)
-                
-                if ai_prob > threshold:
-                    ai_detected_lines.append({
-                        'line_number': i + 1,
-                        'text': line.strip(),
-                        'ai_probability': ai_prob
-                    })
-                else:
-                    human_lines.append({
-                        'line_number': i + 1,
-                        'text': line.strip(),
-                        'ai_probability': ai_prob
-                    })
-                    
-            except Exception as e:
-                self.logger.error(f"Error analyzing line {i+1}: {str(e)}")
-                continue
+                    'text': line,
+                    'ai_probability': ai_prob
+                })
+            else:
+                human_lines.append({
+                    'line_number': i + 1,
+                    'text': line,
+                    'ai_probability': ai_prob
+                })
         
         # Calculate overall statistics
         if line_results:
@@ -296,7 +1405,7 @@ class AITextDetector:
             human_lines_count = len(human_lines)
             
             overall_ai_percentage = (ai_lines_count / total_lines) * 100
-            avg_ai_probability = np.mean([r['ai_probability'] for r in line_results])
+            avg_ai_probability = sum(r['ai_probability'] for r in line_results) / total_lines
             
         else:
             total_lines = ai_lines_count = human_lines_count = 0
@@ -316,7 +1425,7 @@ class AITextDetector:
             'threshold_used': threshold
         }
 
-    def detect_ai_sentences(self, text: str, threshold: float = 0.6) -> Dict:
+    def detect_ai_sentences(self, text: str, threshold: float = 0.6, batch_size: int = BATCH_SIZE) -> Dict:
         """
         Detect which specific sentences in the text are likely AI-generated.
         More granular than line detection.
@@ -324,58 +1433,59 @@ class AITextDetector:
         Args:
             text: Input text to analyze
             threshold: Threshold for considering a sentence AI-generated
+            batch_size: Maximum number of sentences per forward pass
             
         Returns:
             Dict with sentence-by-sentence analysis results
         """
-        import re
-        
-        # Split text into sentences using regex
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+        # Split text into sentences, keeping each one's character span
+        spans = _sentence_spans(text)
+        sentences = [text[start:end] for start, end in spans]
         
         sentence_results = []
         ai_detected_sentences = []
         human_sentences = []
         
-        for i, sentence in enumerate(sentences):
-            try:
-                result = self.detect_ensemble(sentence)
-                ai_prob = result['ensemble_ai_probability']
-                
-                sentence_analysis = {
+        batch_results = self.detect_ensemble_batch(sentences, batch_size=batch_size)
+        
+        for i, (sentence, (start, end), result) in enumerate(zip(sentences, spans, batch_results)):
+            ai_prob = result['ensemble_ai_probability']
+            
+            sentence_analysis = {
+                'sentence_number': i + 1,
+                'sentence_text': sentence,
+                'start': start,
+                'end': end,
+                'ai_probability': ai_prob,
+                'is_ai_generated': ai_prob > threshold,
+                'confidence': result['confidence']
+            }
+            
+            sentence_results.append(sentence_analysis)
+            
+            if ai_prob > threshold:
+                ai_detected_sentences.append({
                     'sentence_number': i + 1,
-                    'sentence_text': sentence,
-                    'ai_probability': ai_prob,
-                    'is_ai_generated': ai_prob > threshold,
-                    'confidence': result['confidence']
-                }
-                
-                sentence_results.append(sentence_analysis)
-                
-                if ai_prob > threshold:
-                    ai_detected_sentences.append({
-                        'sentence_number': i + 1,
-                        'text': sentence,
-                        'ai_probability': ai_prob
-                    })
-                else:
-                    human_sentences.append({
-                        'sentence_number': i + 1,
-                        'text': sentence,
-                        'ai_probability': ai_prob
-                    })
-                    
-            except Exception as e:
-                self.logger.error(f"Error analyzing sentence {i+1}: {str(e)}")
-                continue
+                    'text': sentence,
+                    'start': start,
+                    'end': end,
+                    'ai_probability': ai_prob
+                })
+            else:
+                human_sentences.append({
+                    'sentence_number': i + 1,
+                    'text': sentence,
+                    'start': start,
+                    'end': end,
+                    'ai_probability': ai_prob
+                })
         
         # Calculate statistics
         if sentence_results:
             total_sentences = len(sentence_results)
             ai_sentences_count = len(ai_detected_sentences)
             ai_percentage = (ai_sentences_count / total_sentences) * 100
-            avg_ai_probability = np.mean([r['ai_probability'] for r in sentence_results])
+            avg_ai_probability = sum(r['ai_probability'] for r in sentence_results) / total_sentences
         else:
             total_sentences = ai_sentences_count = 0
             ai_percentage = avg_ai_probability = 0.0
@@ -401,15 +1511,21 @@ class AITextDetector:
         Returns:
             List of available model names
         """
-        return [
-            "roberta-base-openai-detector",
-            "roberta-large-openai-detector",
-            "chatgpt-detector",
-            "mixed-detector",
-            "multilingual-detector",
-            "distilbert-detector",
-            "bert-detector"
-        ]
+        return list(DETECTOR_MODELS)
+    
+    def get_all_models(self, include_auxiliary: bool = True) -> List[str]:
+        """
+        Get list of all selectable models.
+        
+        Args:
+            include_auxiliary: Also include the non-detector classifiers
+            
+        Returns:
+            List of model names
+        """
+        if include_auxiliary:
+            return list(DETECTOR_MODELS) + list(AUXILIARY_MODELS)
+        return list(DETECTOR_MODELS)
     
     def load_all_models(self) -> Dict[str, bool]:
         """
@@ -460,9 +1576,13 @@ class AITextDetector:
             Dict with results from selected models and ensemble
         """
         # Validate that selected models are available
-        available_models = self.get_available_models()
+        available_models = self.get_all_models()
         valid_models = [model for model in selected_models if model in available_models]
         
+        auxiliary = [model for model in valid_models if model in AUXILIARY_MODELS]
+        if auxiliary:
+            self.logger.warning(f"Selected models are not AI detectors and may add noise: {auxiliary}")
+        
         if not valid_models:
             raise ValueError(f"None of the selected models are available. Available models: {available_models}")
         
@@ -484,44 +1604,28 @@ class AITextDetector:
         Returns:
             Dict with results from top N models and ensemble
         """
-        # Define model rankings based on different criteria
-        model_rankings = {
-            "performance": [
-                "mixed-detector",
-                "roberta-large-openai-detector", 
-                "chatgpt-detector",
-                "roberta-base-openai-detector",
-                "multilingual-detector",
-                "distilbert-detector",
-                "bert-detector"
-            ],
-            "speed": [
-                "roberta-base-openai-detector",
-                "distilbert-detector",
-                "chatgpt-detector",
-                "mixed-detector",
-                "roberta-large-openai-detector",
-                "multilingual-detector",
-                "bert-detector"
-            ],
-            "accuracy": [
-                "mixed-detector",
-                "roberta-large-openai-detector",
-                "chatgpt-detector",
-                "roberta-base-openai-detector",
-                "multilingual-detector",
-                "distilbert-detector",
-                "bert-detector"
-            ]
-        }
-        
-        if criteria not in model_rankings:
-            raise ValueError(f"Invalid criteria. Choose from: {list(model_rankings.keys())}")
+        if criteria not in MODEL_RANKINGS:
+            raise ValueError(f"Invalid criteria. Choose from: {list(MODEL_RANKINGS.keys())}")
         
-        top_models = model_rankings[criteria][:n]
+        top_models = MODEL_RANKINGS[criteria][:n]
         
         return self.detect_ensemble(text, models=top_models)
 
+# Process-wide detector shared by the convenience functions below
+_DETECTOR: Optional[AITextDetector] = None
+_DETECTOR_LOCK = threading.Lock()
+
+def _get_detector() -> AITextDetector:
+    """
+    Get the shared detector instance, so loaded models are reused across calls.
+    """
+    global _DETECTOR
+    if _DETECTOR is None:
+        with _DETECTOR_LOCK:
+            if _DETECTOR is None:
+                _DETECTOR = AITextDetector()
+    return _DETECTOR
+
 def detect_with_all_models(text: str) -> Dict:
     """
     Convenience function to detect AI text using all available models.
@@ -532,7 +1636,7 @@ def detect_with_all_models(text: str) -> Dict:
     Returns:
         Detection results from all models
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     return detector.detect_all_models(text)
 
 def detect_with_selected_models(text: str, models: List[str]) -> Dict:
@@ -546,7 +1650,7 @@ def detect_with_selected_models(text: str, models: List[str]) -> Dict:
     Returns:
         Detection results from selected models
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     return detector.detect_selected_models(text, models)
 
 def detect_with_top_models(text: str, n: int = 3, criteria: str = "performance") -> Dict:
@@ -561,7 +1665,7 @@ def detect_with_top_models(text: str, n: int = 3, criteria: str = "performance")
     Returns:
         Detection results from top N models
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     return detector.detect_top_n_models(text, n, criteria)
 
 def get_available_models() -> List[str]:
@@ -571,14 +1675,14 @@ def get_available_models() -> List[str]:
     Returns:
         List of available model names
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     return detector.get_available_models()
 
 def get_ai_lines(text: str, threshold: float = 0.6, min_line_length: int = 20) -> List[str]:
     """
     Get just the AI-detected lines from text.
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     result = detector.detect_ai_lines(text, threshold, min_line_length)
     return [line['text'] for line in result['ai_detected_lines']]  # Only returns text
 
@@ -593,11 +1697,19 @@ def get_ai_sentences(text: str, threshold: float = 0.6) -> List[str]:
     Returns:
         List of AI-detected sentence texts
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     result = detector.detect_ai_sentences(text, threshold)
     return [sentence['text'] for sentence in result['ai_detected_sentences']]
 
-def highlight_ai_text(text: str, threshold: float = 0.6, output_format: str = "markdown") -> str:
+# Highlight markup per highlight_ai_text output format
+_HIGHLIGHT_TEMPLATES = {
+    "markdown": "**[AI: {prob:.2f}]** {sentence}",
+    "html": '<span style="background-color: #ffcccc; font-weight: bold;">[AI: {prob:.2f}] {sentence}</span>',
+    "plain": "[AI-DETECTED: {prob:.2f}] {sentence}"
+}
+
+def highlight_ai_text(text: str, threshold: float = 0.6, output_format: str = "markdown",
+                      sentence_result: Optional[Dict] = None) -> str:
     """
     Highlight AI-detected portions in text with different formatting.
     
@@ -605,40 +1717,44 @@ def highlight_ai_text(text: str, threshold: float = 0.6, output_format: str = "m
         text: Input text to analyze
         threshold: Threshold for considering text AI-generated
         output_format: Output format ('markdown', 'html', 'plain')
+        sentence_result: detect_ai_sentences(text, threshold) output, if the
+            caller already has it
         
     Returns:
         Text with AI portions highlighted according to format
     """
-    detector = AITextDetector()
-    result = detector.detect_ai_sentences(text, threshold)
+    result = sentence_result
+    if result is None:
+        result = _get_detector().detect_ai_sentences(text, threshold)
     
-    highlighted_text = text
-    
-    # Sort sentences by position in text (reverse order to avoid index shifting)
-    ai_sentences = sorted(result['ai_detected_sentences'], 
-                         key=lambda x: text.find(x['text']), reverse=True)
-    
-    for sentence_info in ai_sentences:
-        sentence = sentence_info['text']
-        ai_prob = sentence_info['ai_probability']
-        
-        # Find sentence in original text
-        start_pos = highlighted_text.find(sentence)
-        if start_pos != -1:
-            if output_format == "markdown":
-                highlighted_sentence = f"**[AI: {ai_prob:.2f}]** {sentence}"
-            elif output_format == "html":
-                highlighted_sentence = f'<span style="background-color: #ffcccc; font-weight: bold;">[AI: {ai_prob:.2f}] {sentence}</span>'
-            elif output_format == "plain":
-                highlighted_sentence = f"[AI-DETECTED: {ai_prob:.2f}] {sentence}"
-            else:
-                highlighted_sentence = sentence
-            
-            highlighted_text = (highlighted_text[:start_pos] + 
-                              highlighted_sentence + 
-                              highlighted_text[start_pos + len(sentence):])
+    template = _HIGHLIGHT_TEMPLATES.get(output_format, "{sentence}")
+    
+    # Splice highlights in using the recorded spans; no searching the text
+    pieces = []
+    last_end = 0
+    for sentence_info in sorted(result['ai_detected_sentences'], key=lambda x: x['start']):
+        pieces.append(text[last_end:sentence_info['start']])
+        pieces.append(template.format(prob=sentence_info['ai_probability'], sentence=sentence_info['text']))
+        last_end = sentence_info['end']
     
-    return highlighted_text
+    pieces.append(text[last_end:])
+    return ''.join(pieces)
+
+# Model resolved for the "fast" method, once per process
+_FAST_MODEL: Optional[str] = None
+
+def _get_fast_model(detector: AITextDetector) -> str:
+    """
+    Get the model for the "fast" method: the distilled detector if one is
+    configured and loads, otherwise FAST_FALLBACK_MODEL.
+    """
+    global _FAST_MODEL
+    if _FAST_MODEL is None:
+        if "distil-detector" in DETECTOR_MODELS and detector.load_model("distil-detector"):
+            _FAST_MODEL = "distil-detector"
+        else:
+            _FAST_MODEL = FAST_FALLBACK_MODEL
+    return _FAST_MODEL
 
 def detect_ai_text(text: str, method: str = "ensemble") -> Dict:
     """
@@ -651,15 +1767,37 @@ def detect_ai_text(text: str, method: str = "ensemble") -> Dict:
     Returns:
         Detection results
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     
     if method == "all_models":
         return detector.detect_all_models(text)
     elif method == "fast":
-        return detector.detect_ensemble(text, models=["roberta-base-openai-detector"])
+        return detector.detect_ensemble(text, models=[_get_fast_model(detector)])
     else:  # ensemble (default)
         return detector.detect_ensemble(text)
 
+def detect_ai_text_batch(texts: List[str], method: str = "ensemble") -> List[Dict]:
+    """
+    Detect AI-generated text for several texts at once, each model scoring
+    all of them in shared forward passes.
+    
+    Args:
+        texts: Input texts to analyze
+        method: Detection method ('ensemble', 'all_models', 'fast')
+        
+    Returns:
+        One detection result per text, shaped like detect_ai_text's
+    """
+    detector = _get_detector()
+    
+    if method == "all_models":
+        models = detector.get_available_models()
+    elif method == "fast":
+        models = [_get_fast_model(detector)]
+    else:  # ensemble (default)
+        models = None
+    return detector.detect_ensemble_batch(texts, models=models)
+
 def is_ai_generated(text: str, threshold: float = 0.7) -> Tuple[bool, float]:
     """
     Simple function to check if text is AI-generated.
@@ -671,11 +1809,24 @@ def is_ai_generated(text: str, threshold: float = 0.7) -> Tuple[bool, float]:
     Returns:
         Tuple of (is_ai_generated, confidence)
     """
-    result = detect_ai_text(text)
-    ai_prob = result['ensemble_ai_probability']
-    confidence = result['confidence']
+    detector = _get_detector()
+    ai_stats = _running_stats()
+    
+    # Logit fast path: no softmax on the device, the two-class probability is
+    # recovered on the host as sigmoid(logit_ai - logit_human)
+    for model_name in DEFAULT_ENSEMBLE:
+        try:
+            result = detector.detect_single_model(text, model_name, return_logits=True)
+        except Exception as e:
+            detector.logger.error(f"Error with model {model_name}: {str(e)}")
+            continue
+        if 'error' not in result and 'note' not in result:
+            ai_stats.push(1.0 / (1.0 + math.exp(-result['logits_diff'])))
+    
+    if not ai_stats.n:
+        return False, 0.0
     
-    return ai_prob > threshold, confidence
+    return ai_stats.mean > threshold, max(0.0, 1.0 - ai_stats.std)
 
 # Update the example usage section
 if __name__ == "__main__":
@@ -735,7 +1886,7 @@ def get_ai_lines_with_details(text: str, threshold: float = 0.6, min_line_length
     Returns:
         List of dictionaries with line details
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     result = detector.detect_ai_lines(text, threshold, min_line_length)
     return result['ai_detected_lines']
 
@@ -751,7 +1902,7 @@ def get_ai_lines_formatted(text: str, threshold: float = 0.6, min_line_length: i
     Returns:
         Formatted string with AI lines and their details
     """
-    detector = AITextDetector()
+    detector = _get_detector()
     result = detector.detect_ai_lines(text, threshold, min_line_length)
     
     formatted_lines = []
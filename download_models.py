@@ -1,17 +1,34 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+
+# Use the Rust downloader for individual files when it's installed
+if find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from transformers import T5Tokenizer, T5ForConditionalGeneration
 
 models = [
     "t5-small",
-    "t5-base", 
+    "t5-base",
     "Vamsi/T5_Paraphrase_Paws",
     "humarin/chatgpt_paraphraser_on_T5_base"
 ]
 
-for model_name in models:
+def _download_one(model_name):
     print(f"Downloading {model_name}...")
     try:
-        tokenizer = T5Tokenizer.from_pretrained(model_name)
-        model = T5ForConditionalGeneration.from_pretrained(model_name)
+        T5Tokenizer.from_pretrained(model_name)
+        T5ForConditionalGeneration.from_pretrained(model_name)
         print(f"✓ {model_name} downloaded successfully")
+        return True
     except Exception as e:
         print(f"✗ Failed to download {model_name}: {e}")
+        return False
+
+if __name__ == "__main__":
+    # Downloads are network-bound, so fetch all models concurrently into the shared HF cache
+    with ThreadPoolExecutor(max_workers=len(models)) as executor:
+        results = list(executor.map(_download_one, models))
+
+    print(f"{sum(results)}/{len(models)} models downloaded")
@@ -696,7 +696,8 @@ export async function humanizeAndCheck(text, enhanced, selected, threshold) {
 
         if (response.ok) {
             const data = await response.json();
-            combinedResults.set(data);
+            // The backend doesn't echo the input back by default
+            combinedResults.set({ original_text: text, ...data });
             showCombinedResults.set(true);
             
             const improved = data.improvement.detection_improved;
@@ -0,0 +1,18 @@
+# Gunicorn settings for serving the API: gunicorn wsgi:app -c gunicorn_conf.py
+import os
+
+bind = os.environ.get("HUMANIZER_BIND", "0.0.0.0:8080")
+
+# A single worker keeps one copy of each model in memory/VRAM; concurrency
+# comes from threads, which overlap request parsing and CPU-only endpoints
+# with model inference and feed the paraphrase batching pool
+workers = int(os.environ.get("HUMANIZER_WORKERS", 1))
+worker_class = "gthread"
+threads = int(os.environ.get("HUMANIZER_THREADS", 16))
+
+# Multi-model pipelines on long texts can take a while
+timeout = 120
+
+# Models and the batching thread must be created inside the worker, not
+# in the master before forking
+preload_app = False
@@ -1,34 +1,165 @@
 import os
 import json
 import time
-from typing import Dict, Tuple
-from flask import Flask, request, jsonify
+import difflib
+import functools
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import logging
 import re
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import our utility modules
-from paraphraser import paraphrase_text, load_model, get_available_models, get_current_model, get_device_info
+import paraphraser
+from paraphraser import paraphrase_batch, preload_model, cancel_preload, fetch_model, compile_model, COMPILE_ENABLED, WARMUP_TEXT, load_model, get_available_models, get_current_model, get_device_info
 from rewriter import rewrite_text, get_synonym, refine_text
+from batching import BatchingPool
+from response_cache import ResponseCache
 from detector import (
-    AITextDetector, 
     detect_with_all_models, 
     detect_with_selected_models, 
     detect_with_top_models,
     get_available_models as get_detection_models,
     get_ai_lines,
     get_ai_sentences,
-    highlight_ai_text
+    highlight_ai_text,
+    detect_ai_text_batch,
+    _get_detector
 )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to the default encoder for types orjson rejects"""
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj) -> bytes:
+        """Serialize straight to UTF-8 bytes, skipping the str round trip"""
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
 # Initialize Flask app
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 CORS(app, origins="*")
 
+def _json_bytes(obj) -> bytes:
+    """Encode obj as JSON bytes with the app's provider"""
+    if isinstance(app.json, OrjsonProvider):
+        return app.json.dumps_bytes(obj)
+    return app.json.dumps(obj).encode()
+
+# Requests are rejected by Content-Length before their JSON is parsed. A
+# character can take up to 12 bytes once JSON-escaped (a surrogate pair of
+# \uXXXX escapes), plus room for the other fields
+JSON_BYTES_PER_CHAR = 12
+JSON_BODY_OVERHEAD = 4096
+MAX_TEXT_LENGTH = 50000
+# Line and sentence level detection runs per segment, so it takes less text
+MAX_SEGMENT_TEXT_LENGTH = 15000
+
+def _max_body_bytes(max_chars: int) -> int:
+    return max_chars * JSON_BYTES_PER_CHAR + JSON_BODY_OVERHEAD
+
+# Werkzeug enforces this while reading the stream, covering chunked bodies
+app.config['MAX_CONTENT_LENGTH'] = _max_body_bytes(MAX_TEXT_LENGTH)
+
+# Tighter limits for endpoints that accept less text
+_ENDPOINT_BODY_LIMITS = {
+    'detect_lines_handler': _max_body_bytes(MAX_SEGMENT_TEXT_LENGTH),
+    'detect_sentences_handler': _max_body_bytes(MAX_SEGMENT_TEXT_LENGTH),
+    'highlight_ai_handler': _max_body_bytes(MAX_SEGMENT_TEXT_LENGTH),
+}
+
+@app.before_request
+def reject_oversized_body():
+    """Fail fast with 413 when the declared body size can't hold a valid request"""
+    limit = _ENDPOINT_BODY_LIMITS.get(request.endpoint, app.config['MAX_CONTENT_LENGTH'])
+    if request.content_length is not None and request.content_length > limit:
+        return jsonify({"error": "Request body too large"}), 413
+
+def json_endpoint(required_fields=('text',), min_len=None, max_len=None, purpose=None):
+    """
+    Parse and validate a JSON request body once before calling the handler
+
+    Args:
+        required_fields: Fields that must be present and non-empty; string values are stripped
+        min_len: Minimum length of the text field
+        max_len: Maximum length of the text field
+        purpose: What the limits apply to, appended to the length error messages
+
+    Returns:
+        Decorator that calls the handler with the validated request data
+    """
+    suffix = f" for {purpose}" if purpose else ""
+    too_short = f"Text must be at least {min_len} characters long{suffix}"
+    too_long = f"Text must be less than {max_len:,} characters{suffix}" if max_len else None
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            # Parsed once per request straight from the body bytes by the
+            # app's JSON provider (orjson when installed): a wrong Content-Type
+            # or malformed body yields None instead of raising. Nothing reads
+            # the body again, so the raw bytes aren't kept alongside the dict
+            data = request.get_json(silent=True, cache=False)
+            if not isinstance(data, dict):
+                return jsonify({"error": "Content-Type must be application/json"}), 400
+
+            for field in required_fields:
+                value = data.get(field)
+                if isinstance(value, str):
+                    value = value.strip()
+                    data[field] = value
+                if not value:
+                    return jsonify({"error": f"No {field} provided"}), 400
+
+            text = data.get('text')
+            if isinstance(text, str):
+                length = len(text)
+                if min_len is not None and length < min_len:
+                    return jsonify({"error": too_short}), 400
+                if max_len is not None and length > max_len:
+                    return jsonify({"error": too_long}), 400
+
+            return handler(data, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# One pass over the text for clean_final_text. Spaces before an em dash are
+# dropped along with it, and a dash followed by "," "." or another dash
+# becomes a bare "," so the result matches replacing dashes first and then
+# stripping spaces before punctuation.
+_CLEAN_RE = re.compile(r'( *— *(?=[,.—]))|( *—)| +(?=[,.])')
+
+def _clean_sub(match: re.Match) -> str:
+    if match.group(1) is not None:
+        return ","
+    if match.group(2) is not None:
+        return ", "
+    return ""
+
 def clean_final_text(text: str) -> str:
     """
     Clean the final text by:
@@ -37,20 +168,54 @@ def clean_final_text(text: str) -> str:
     """
     if not text:
         return text
-    
-    # Step 1: Replace em dashes with commas
-    cleaned_text = text.replace("—", ", ")
-    
-    # Step 2: Remove spaces before commas and periods
-    # This regex finds spaces that are followed by comma or period
-    cleaned_text = re.sub(r' +([,.])', r'\1', cleaned_text)
-    
-    return cleaned_text
+    return _CLEAN_RE.sub(_clean_sub, text)
+
+TEXT_PREVIEW_LENGTH = 100
+
+def _detection_response(text: str, result: Dict, threshold: float, return_individual: bool = True, **extra) -> Dict:
+    """
+    Build the response body shared by the ensemble detection endpoints
+
+    Args:
+        text: Text that was analyzed
+        result: Ensemble result from the detector
+        threshold: AI probability above which the text counts as AI-generated
+        return_individual: Include the per-model breakdown, most of the body for large ensembles
+        **extra: Endpoint-specific fields
+
+    Returns:
+        Response dictionary
+    """
+    response = {
+        "text_preview": text[:TEXT_PREVIEW_LENGTH] + "..." if len(text) > TEXT_PREVIEW_LENGTH else text,
+        "is_ai_generated": result['ensemble_ai_probability'] > threshold,
+        "ai_probability": result['ensemble_ai_probability'],
+        "human_probability": result['ensemble_human_probability'],
+        "prediction": result['prediction'],
+        "confidence": result['confidence'],
+        "threshold_used": threshold,
+        "models_used": result['models_used'],
+        "individual_results": result['individual_results'],
+        **extra,
+        "text_length": len(text),
+        "success": True
+    }
+    if not return_individual:
+        del response["individual_results"]
+    return response
+
+# skip_if_human returns text unchanged when its AI probability is below this
+HUMAN_SKIP_THRESHOLD = 0.3
+# /humanize_and_check returns text scoring at least this far below its
+# detection threshold without humanizing it; closer calls still get humanized
+CASCADE_MARGIN = 0.05
 
 class HumanizerService:
     """Main orchestrator service that combines paraphrasing and rewriting"""
     
     def __init__(self):
+        # Serves repeated or near-identical requests without running the models
+        self.cache = ResponseCache()
         logger.info("HumanizerService initialized")
     
     def humanize_text(
@@ -58,15 +223,53 @@ class HumanizerService:
         text: str, 
         use_paraphrasing: bool = True,
         use_enhanced_rewriting: bool = False,
-        paraphrase_model: str = None
+        paraphrase_model: str = None,
+        skip_if_human: bool = False
     ) -> Tuple[str, Dict]:
         """
         Complete text humanization pipeline:
         1. Paraphrase the text (optional)
         2. Rewrite and refine the result
         3. Clean the final text
+        
+        With skip_if_human, text the fastest detector already scores as
+        human-written is returned unchanged.
+        """
+        for event in self.humanize_text_iter(text, use_paraphrasing, use_enhanced_rewriting, paraphrase_model, skip_if_human):
+            pass
+        return event["text"], event["statistics"]
+    
+    def humanize_text_iter(
+        self, 
+        text: str, 
+        use_paraphrasing: bool = True,
+        use_enhanced_rewriting: bool = False,
+        paraphrase_model: str = None,
+        skip_if_human: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Run the humanization pipeline, yielding an event as each step finishes
+
+        Yields:
+            {"step", "text", "success"} per step, then a final
+            {"step": "done", "text", "statistics"} event
         """
         
+        # Key on the model that will actually run: None means the current one,
+        # which /load_model can switch
+        cache_options = {
+            "paraphrasing": use_paraphrasing,
+            "enhanced": use_enhanced_rewriting,
+            "model": (paraphrase_model or get_current_model()) if use_paraphrasing else None,
+            "skip_if_human": skip_if_human
+        }
+        cached, cache_tier = self.cache.get(text, cache_options)
+        if cached is not None:
+            final_text, cached_stats = cached
+            logger.debug("Serving humanization from %s cache", cache_tier)
+            yield {"step": "done", "text": final_text, "statistics": {**cached_stats, "cache_hit": cache_tier}}
+            return
+        
         stats = {
             "original_length": len(text),
             "paraphrasing_used": False,
@@ -78,87 +281,209 @@ class HumanizerService:
         try:
             current_text = text
             
+            # Step 0: One cheap detector pass instead of a full generate for text that is already human
+            if skip_if_human:
+                ai_probability = self._human_check(text)
+                if ai_probability is not None and ai_probability < HUMAN_SKIP_THRESHOLD:
+                    stats.update({
+                        "processing_steps": ["human_check"],
+                        "skipped_reason": "already_human",
+                        "ai_probability": ai_probability,
+                        "final_length": len(text),
+                        "length_change": 0
+                    })
+                    self.cache.put(text, cache_options, (text, stats))
+                    yield {"step": "done", "text": text, "statistics": {**stats, "cache_hit": False}}
+                    return
+            
             # Step 1: Paraphrasing (if enabled)
             if use_paraphrasing:
-                logger.info("Starting paraphrasing step")
-                paraphrased, err = paraphrase_text(current_text, paraphrase_model)
+                logger.debug("Starting paraphrasing step")
+                paraphrased, err = paraphrase_pool.submit(current_text, paraphrase_model)
                 
                 if not err and paraphrased and paraphrased.strip():
                     current_text = paraphrased
                     stats["paraphrasing_used"] = True
-                    stats["model_used"] = get_current_model()
+                    stats["model_used"] = refresh_model_state()['current']
                     stats["processing_steps"].append("paraphrasing")
-                    logger.info("Paraphrasing successful")
-                    
-                    # Clean up common formatting issues from paraphrasing
-                    if current_text.startswith(": "):
-                        current_text = current_text[2:]
+                    logger.debug("Paraphrasing successful")
                 else:
-                    logger.warning(f"Paraphrasing failed or skipped: {err}")
+                    logger.warning("Paraphrasing failed or skipped: %s", err)
                     stats["processing_steps"].append("paraphrasing_failed")
+                yield {"step": "paraphrasing", "text": current_text, "success": stats["paraphrasing_used"]}
             
             # Step 2: Rewriting and refinement
-            logger.info("Starting rewriting step")
+            logger.debug("Starting rewriting step")
             final_text, err = rewrite_text(current_text, enhanced=use_enhanced_rewriting)
             
             if err:
-                logger.warning(f"Rewriting failed: {err}")
+                logger.warning("Rewriting failed: %s", err)
                 final_text = current_text
                 stats["processing_steps"].append("rewriting_failed")
             else:
                 stats["processing_steps"].append("rewriting")
+            yield {"step": "rewriting", "text": final_text, "success": not err}
             
             # Step 3: Clean the final text
-            logger.info("Cleaning final text")
+            logger.debug("Cleaning final text")
             final_text = clean_final_text(final_text)
             stats["processing_steps"].append("text_cleaning")
             
             stats["final_length"] = len(final_text)
             stats["length_change"] = stats["final_length"] - stats["original_length"]
             
-            return final_text, stats
+            # A failed step (pool timeout, model load error, OOM) is transient;
+            # caching its degraded output would serve it to every later request
+            if not any(step.endswith("_failed") for step in stats["processing_steps"]):
+                self.cache.put(text, cache_options, (final_text, stats))
+            yield {"step": "done", "text": final_text, "statistics": {**stats, "cache_hit": False}}
             
         except Exception as e:
-            logger.error(f"Error in humanization pipeline: {str(e)}")
-            return text, {
+            logger.error("Error in humanization pipeline: %s", e)
+            yield {"step": "done", "text": text, "statistics": {
                 **stats,
                 "error": str(e),
                 "processing_steps": stats["processing_steps"] + ["error"]
-            }
+            }}
+
+    @staticmethod
+    def _human_check(text: str) -> Optional[float]:
+        """AI probability from the fastest detection model, or None if detection failed"""
+        try:
+            result = detect_with_top_models(text, n=1, criteria="speed")
+        except Exception as e:
+            logger.warning("Human check failed, humanizing anyway: %s", e)
+            return None
+        if any('error' in r for r in result['individual_results'].values()):
+            return None
+        return result['ensemble_ai_probability']
 
 # Initialize services
+if COMPILE_ENABLED and get_current_model() is not None:
+    compile_model()
+
+paraphrase_pool = BatchingPool(paraphrase_batch, preferred_key=get_current_model).start()
 humanizer_service = HumanizerService()
-ai_detector = AITextDetector()
+ai_detector = _get_detector()
+
+# Opt in to warming up models in the background at startup
+WARMUP_ENABLED = os.environ.get("HUMANIZER_WARMUP") == "1"
+
+def _warmup():
+    """
+    Take the first-request costs up front: load the default detection
+    ensemble and run it on a short text, then on a longer batch through the
+    batched path the line/sentence endpoints use; run one paraphrase through
+    the batching pool on the current model, and fetch the other paraphrase
+    models' files so switching to them doesn't wait on a download. Only one
+    paraphrase model is kept loaded, so the others are not kept in memory.
+    """
+    start_ns = time.perf_counter_ns()
+    try:
+        ai_detector.detect_ensemble(WARMUP_TEXT)
+        detect_ai_text_batch([WARMUP_TEXT, " ".join([WARMUP_TEXT] * 8)])
+
+        current = get_current_model()
+        if current is not None:
+            paraphrase_pool.submit(WARMUP_TEXT)
+
+        for name in get_available_models():
+            if name != current:
+                fetch_model(name)
+    except Exception as e:
+        logger.warning("Warmup failed: %s", e)
+    logger.info("Warmup finished in %.1fs", (time.perf_counter_ns() - start_ns) / 1e9)
+
+if WARMUP_ENABLED:
+    threading.Thread(target=_warmup, name="warmup", daemon=True).start()
+
+# Define the 2 best models (prioritize specialized paraphrasing models)
+BEST_PARAPHRASE_MODELS = [
+    "humarin/chatgpt_paraphraser_on_T5_base",
+    "Vamsi/T5_Paraphrase_Paws"
+]
+
+# Model info served by the read-only endpoints, rebuilt only when the
+# paraphraser reports a model change
+_model_state = {'current': None, 'available': [], 'best_pair': [], 'device': None, 'version': None, 'bodies': {}}
+
+def refresh_model_state(force: bool = False) -> Dict:
+    """
+    Return the cached model state, rebuilding it and the pre-encoded
+    response bodies if the loaded paraphrase model has changed
+
+    Args:
+        force: Rebuild even if the model version is unchanged
+
+    Returns:
+        The current model state
+    """
+    global _model_state
+
+    version = paraphraser.model_version
+    if not force and _model_state['version'] == version:
+        return _model_state
+
+    current_model = get_current_model()
+    available_models = get_available_models()
+    device = get_device_info()
+
+    # Models used by /paraphrase_multi, falling back to the first 2 available
+    # models if the best models aren't available
+    best_pair = [model for model in BEST_PARAPHRASE_MODELS if model in available_models]
+    if len(best_pair) < 2:
+        best_pair = available_models[:2]
+
+    bodies = {
+        '/': _json_bytes({
+            "status": "healthy",
+            "message": "🚀 Humanize AI Server is running!",
+            "features": {
+                "paraphrasing": current_model is not None,
+                "current_model": current_model,
+                "available_models": available_models,
+                "local_refinement": True,
+                "synonym_support": True,
+                "device": device
+            }
+        }),
+        '/models': _json_bytes({
+            "available_models": available_models,
+            "current_model": current_model,
+            "device": device
+        })
+    }
+
+    # Swap in a new dict so concurrent readers never see a half-built state
+    _model_state = {
+        'current': current_model,
+        'available': available_models,
+        'best_pair': best_pair,
+        'device': device,
+        'version': version,
+        'bodies': bodies
+    }
+    return _model_state
+
+refresh_model_state(force=True)
 
 @app.route('/', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    current_model = get_current_model()
-    return jsonify({
-        "status": "healthy",
-        "message": "🚀 Humanize AI Server is running!",
-        "features": {
-            "paraphrasing": current_model is not None,
-            "current_model": current_model,
-            "available_models": get_available_models(),
-            "local_refinement": True,
-            "synonym_support": True,
-            "device": get_device_info()
-        }
-    })
+    return Response(refresh_model_state()['bodies']['/'], mimetype='application/json')
 
 @app.route('/health', methods=['GET'])
 def detailed_health():
     """Detailed health check with system information - matches frontend expectations"""
-    current_model = get_current_model()
+    state = refresh_model_state()
     return jsonify({
         "status": "healthy",
         "timestamp": time.time(),
         "features": {
-            "paraphrasing_available": current_model is not None,
-            "current_paraphrase_model": current_model,
+            "paraphrasing_available": state['current'] is not None,
+            "current_paraphrase_model": state['current'],
             "local_processing": True,
-            "device": get_device_info()
+            "device": state['device']
         },
         "version": "3.0.0"
     })
@@ -166,26 +491,16 @@ def detailed_health():
 @app.route('/models', methods=['GET'])
 def get_models():
     """Get available paraphrasing models - matches frontend expectations"""
-    return jsonify({
-        "available_models": get_available_models(),
-        "current_model": get_current_model(),
-        "device": get_device_info()
-    })
+    return Response(refresh_model_state()['bodies']['/models'], mimetype='application/json')
 
 @app.route('/load_model', methods=['POST'])
-def load_model_endpoint():
+@json_endpoint(required_fields=('model_name',))
+def load_model_endpoint(data):
     """Load a specific paraphrasing model - matches frontend expectations"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        model_name = data.get('model_name', '').strip()
-        
-        if not model_name:
-            return jsonify({"error": "No model_name provided"}), 400
+        model_name = data['model_name']
         
-        available_models = get_available_models()
+        available_models = refresh_model_state()['available']
         if model_name not in available_models:
             return jsonify({
                 "error": f"Model {model_name} not supported",
@@ -193,75 +508,69 @@ def load_model_endpoint():
             }), 400
         
         success, error = load_model(model_name)
+        state = refresh_model_state()
         if success:
             return jsonify({
                 "message": f"Successfully loaded {model_name}",
-                "current_model": get_current_model(),
+                "current_model": state['current'],
                 "success": True
             })
         else:
             return jsonify({"error": error or f"Failed to load model {model_name}"}), 500
         
     except Exception as e:
-        logger.error(f"Error in /load_model: {str(e)}")
+        logger.error("Error in /load_model: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/humanize', methods=['POST'])
-def humanize_handler():
+@json_endpoint(min_len=10, max_len=MAX_TEXT_LENGTH)
+def humanize_handler(data):
     """Main endpoint for humanizing AI-generated text - matches frontend expectations"""
     try:
-        logger.info("Humanize request received")
-        
-        # Validate request
-        if not request.is_json:
-            logger.error("Invalid content type")
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-        
-        data = request.get_json()
-        if not data or "text" not in data:
-            logger.error("Missing text field in request")
-            return jsonify({"error": "Text field is required"}), 400
-        
-        text = data.get("text", "").strip()
-        if not text:
-            logger.error("Empty text received")
-            return jsonify({"error": "Text cannot be empty"}), 400
-        
-        # Validate text length
-        if len(text) < 10:
-            return jsonify({"error": "Text must be at least 10 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 5000 to 50000
-            return jsonify({"error": "Text must be less than 50000 characters"}), 400
+        text = data["text"]
         
         # Extract options - match frontend parameter names
         use_paraphrasing = data.get("paraphrasing", True)
         use_enhanced = data.get("enhanced", True)  # Changed from False to True
         paraphrase_model = data.get("model", None)
+        skip_if_human = data.get("skip_if_human", False)
         
         # Process text through humanization pipeline
-        humanized_text, stats = humanizer_service.humanize_text(
+        events = humanizer_service.humanize_text_iter(
             text=text,
             use_paraphrasing=use_paraphrasing,
             use_enhanced_rewriting=use_enhanced,  # This will now use the more aggressive mode
-            paraphrase_model=paraphrase_model
+            paraphrase_model=paraphrase_model,
+            skip_if_human=skip_if_human
         )
         
-        # Ensure we return something
-        if not humanized_text or not humanized_text.strip():
-            humanized_text = text
+        def build_response(done):
+            humanized_text, stats = done["text"], done["statistics"]
+            
+            # Ensure we return something
+            if not humanized_text or not humanized_text.strip():
+                humanized_text = text
+            
+            logger.info("Humanize request processed: %d -> %d chars, steps=%s", stats['original_length'], stats['final_length'], stats['processing_steps'])
+            return {
+                "humanized_text": humanized_text,
+                "success": True,
+                "statistics": stats
+            }
         
-        response = {
-            "humanized_text": humanized_text,
-            "success": True,
-            "statistics": stats
-        }
+        # With ?stream=true, send each step as an event and the full response last
+        if request.args.get('stream', '').lower() == 'true':
+            def stream():
+                for event in events:
+                    yield {'final': build_response(event)} if event["step"] == "done" else event
+            return _event_stream(stream())
         
-        logger.info(f"Successfully processed text: {stats['original_length']} -> {stats['final_length']} chars")
-        return jsonify(response)
+        for event in events:
+            pass
+        return jsonify(build_response(event))
         
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        logger.error("Error processing request: %s", e, exc_info=True)
         return jsonify({
             "error": "Internal server error",
             "success": False
@@ -269,20 +578,14 @@ def humanize_handler():
 
 # Additional endpoints for direct access
 @app.route('/paraphrase', methods=['POST'])
-def paraphrase_handler():
+@json_endpoint()
+def paraphrase_handler(data):
     """Direct paraphrasing endpoint"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         model_name = data.get('model_name', None)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        paraphrased_text, error = paraphrase_text(text, model_name)
+        paraphrased_text, error = paraphrase_pool.submit(text, model_name)
         
         if error:
             return jsonify({"error": error}), 500
@@ -290,26 +593,20 @@ def paraphrase_handler():
         return jsonify({
             'paraphrased': paraphrased_text,
             'success': True,
-            'model_used': get_current_model(),
+            'model_used': refresh_model_state()['current'],
             'original_text': text
         })
 
     except Exception as e:
-        logger.error(f"Error in /paraphrase: {str(e)}")
+        logger.error("Error in /paraphrase: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/synonym', methods=['POST'])
-def synonym_handler():
+@json_endpoint(required_fields=('word',))
+def synonym_handler(data):
     """Get synonym for a word"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        word = data.get('word', '').strip()
-        
-        if not word:
-            return jsonify({"error": "No word provided"}), 400
+        word = data['word']
         
         synonym, error = get_synonym(word)
         
@@ -323,21 +620,15 @@ def synonym_handler():
         })
 
     except Exception as e:
-        logger.error(f"Error in /synonym: {str(e)}")
+        logger.error("Error in /synonym: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/refine', methods=['POST'])
-def refine_handler():
+@json_endpoint()
+def refine_handler(data):
     """Refine text using NLP tools"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
-        
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
+        text = data['text']
         
         refined_text, error = refine_text(text)
         
@@ -351,70 +642,53 @@ def refine_handler():
         })
 
     except Exception as e:
-        logger.error(f"Error in /refine: {str(e)}")
+        logger.error("Error in /refine: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/paraphrase_only', methods=['POST'])
-def paraphrase_only_handler():
+@json_endpoint(min_len=10, max_len=MAX_TEXT_LENGTH)
+def paraphrase_only_handler(data):
     """Paraphrase text without rewriting - for step-by-step processing"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         model_name = data.get('model', None)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 10:
-            return jsonify({"error": "Text must be at least 10 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 5000 to 50000
-            return jsonify({"error": "Text must be less than 50000 characters"}), 400
-        
-        paraphrased_text, error = paraphrase_text(text, model_name)
+        paraphrased_text, error = paraphrase_pool.submit(text, model_name)
         
         if error:
             return jsonify({"error": error}), 500
         
-        # Clean up common formatting issues
-        if paraphrased_text and paraphrased_text.startswith(": "):
-            paraphrased_text = paraphrased_text[2:]
+        paraphrased_text = paraphrased_text or text
+        original_length = len(text)
+        paraphrased_length = len(paraphrased_text)
+        model_used = refresh_model_state()['current']
         
         return jsonify({
-            'paraphrased_text': paraphrased_text or text,
+            'paraphrased_text': paraphrased_text,
             'success': True,
-            'model_used': get_current_model(),
+            'model_used': model_used,
             'original_text': text,
             'statistics': {
-                'original_length': len(text),
-                'paraphrased_length': len(paraphrased_text) if paraphrased_text else len(text),
-                'length_change': (len(paraphrased_text) if paraphrased_text else len(text)) - len(text),
-                'model_used': get_current_model(),
+                'original_length': original_length,
+                'paraphrased_length': paraphrased_length,
+                'length_change': paraphrased_length - original_length,
+                'model_used': model_used,
                 'paraphrasing_used': True
             }
         })
 
     except Exception as e:
-        logger.error(f"Error in /paraphrase_only: {str(e)}")
+        logger.error("Error in /paraphrase_only: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/rewrite_only', methods=['POST'])
-def rewrite_only_handler():
+@json_endpoint()
+def rewrite_only_handler(data):
     """Rewrite text without paraphrasing - for step-by-step processing"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         enhanced = data.get('enhanced', False)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
         rewritten_text, error = rewrite_text(text, enhanced=enhanced)
         
         if error:
@@ -423,270 +697,420 @@ def rewrite_only_handler():
         # Clean the final rewritten text
         rewritten_text = clean_final_text(rewritten_text or text)
         
+        original_length = len(text)
+        rewritten_length = len(rewritten_text)
+        
         return jsonify({
             'rewritten_text': rewritten_text,
             'success': True,
             'original_text': text,
             'statistics': {
-                'original_length': len(text),
-                'rewritten_length': len(rewritten_text),
-                'length_change': len(rewritten_text) - len(text),
+                'original_length': original_length,
+                'rewritten_length': rewritten_length,
+                'length_change': rewritten_length - original_length,
                 'enhanced_rewriting_used': enhanced,
                 'text_cleaning_applied': True
             }
         })
 
     except Exception as e:
-        logger.error(f"Error in /rewrite_only: {str(e)}")
+        logger.error("Error in /rewrite_only: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/paraphrase_multi', methods=['POST'])
-def paraphrase_multi_handler():
-    """Paraphrase text through 2 best models in PIPELINE (each model processes previous output)"""
+# A pipeline step whose output is at least this similar to its input ends the pipeline
+CONVERGENCE_RATIO = 0.98
+
+def _converged(before: str, after: str) -> bool:
+    """Whether a paraphrase left the text essentially unchanged"""
+    if before == after:
+        return True
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    # quick_ratio is a cheap upper bound on ratio
+    return matcher.quick_ratio() > CONVERGENCE_RATIO and matcher.ratio() > CONVERGENCE_RATIO
+
+def _pipeline_steps(text: str, models: List[str], timed: bool = False) -> Iterator[Tuple[Dict, Optional[str]]]:
+    """
+    Run text through models in PIPELINE, each model paraphrasing the previous output
+
+    Args:
+        text: Original text
+        models: Paraphrasing models in pipeline order
+        timed: Include each step's processing_time in its result
+
+    Yields:
+        Tuple of (step_result, error_message) as soon as each step finishes;
+        stops early once a step leaves the text essentially unchanged
+    """
+    current_text = text  # Start with original text
+    # The model after the last step that ran, if its weights are being preloaded
+    preloaded = None
+    
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
-        
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 10:
-            return jsonify({"error": "Text must be at least 10 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 5000 to 50000
-            return jsonify({"error": "Text must be less than 50000 characters"}), 400
-        
-        # Define the 2 best models (prioritize specialized paraphrasing models)
-        best_models = [
-            "humarin/chatgpt_paraphraser_on_T5_base",
-            "Vamsi/T5_Paraphrase_Paws"
-        ]
-        
-        # Filter available models
-        available_models = get_available_models()
-        models_to_use = [model for model in best_models if model in available_models]
-        
-        # Fallback to first 2 available models if best models aren't available
-        if len(models_to_use) < 2:
-            models_to_use = available_models[:2]
-        
-        if not models_to_use:
-            return jsonify({"error": "No models available for paraphrasing"}), 500
-        
-        results = []
-        errors = []
-        current_text = text  # Start with original text
-        
-        for i, model_name in enumerate(models_to_use):
+        for i, model_name in enumerate(models):
+            model_start_ns = time.perf_counter_ns()
             try:
-                logger.info(f"Pipeline step {i+1}: Paraphrasing with model {model_name}")
-                paraphrased_text, error = paraphrase_text(current_text, model_name)
-                
+                logger.debug("Pipeline step %d/%d: Paraphrasing with model %s", i + 1, len(models), model_name)
+
+                # Load the next step's weights while this step generates
+                if i + 1 < len(models):
+                    preload_model(models[i + 1])
+                    preloaded = models[i + 1]
+                else:
+                    preloaded = None
+
+                paraphrased_text, error = paraphrase_pool.submit(current_text, model_name)
+            
+                model_ms = (time.perf_counter_ns() - model_start_ns) // 1_000_000
+            
                 if error:
-                    errors.append(f"Step {i+1} ({model_name}): {error}")
                     # On error, continue with current text (don't break the pipeline)
                     paraphrased_text = current_text
-                
-                # Clean up common formatting issues
-                if paraphrased_text and paraphrased_text.startswith(": "):
-                    paraphrased_text = paraphrased_text[2:]
-                
+            
                 # If paraphrasing failed, use current text
                 if not paraphrased_text or not paraphrased_text.strip():
                     paraphrased_text = current_text
-                
-                results.append({
+            
+                input_length = len(current_text)
+                output_length = len(paraphrased_text)
+                result = {
                     "step": i + 1,
                     "model": model_name,
                     "input_text": current_text,
                     "output_text": paraphrased_text,
-                    "input_length": len(current_text),
-                    "output_length": len(paraphrased_text),
-                    "length_change": len(paraphrased_text) - len(current_text),
-                    "success": not error
-                })
-                
+                    "input_length": input_length,
+                    "output_length": output_length,
+                    "length_change": output_length - input_length
+                }
+                if timed:
+                    result["processing_time"] = model_ms / 1000
+                result["success"] = not error
+                converged = not error and i + 1 < len(models) and _converged(current_text, paraphrased_text)
+                if converged:
+                    result["converged"] = True
+            
                 # Update current_text for next iteration (PIPELINE EFFECT)
                 current_text = paraphrased_text
-                
+            
+                yield result, f"Step {i+1} ({model_name}): {error}" if error else None
+                if converged:
+                    logger.debug("Pipeline converged after step %d/%d", i + 1, len(models))
+                    break
+            
             except Exception as e:
-                logger.error(f"Error with model {model_name}: {str(e)}")
-                errors.append(f"Step {i+1} ({model_name}): {str(e)}")
+                model_ms = (time.perf_counter_ns() - model_start_ns) // 1_000_000
+                logger.error("Error with model %s: %s", model_name, e)
+            
                 # Continue with current text on error
-                results.append({
+                result = {
                     "step": i + 1,
                     "model": model_name,
                     "input_text": current_text,
                     "output_text": current_text,  # No change on error
                     "input_length": len(current_text),
                     "output_length": len(current_text),
-                    "length_change": 0,
-                    "success": False,
-                    "error": str(e)
-                })
+                    "length_change": 0
+                }
+                if timed:
+                    result["processing_time"] = model_ms / 1000
+                result["success"] = False
+                result["error"] = str(e)
+            
+                yield result, f"Step {i+1} ({model_name}): {str(e)}"
+    finally:
+        # A pipeline that stopped early (convergence or a closed stream)
+        # would otherwise leave the next model's pinned weights resident
+        if preloaded is not None:
+            cancel_preload(preloaded)
+
+def _fanout_steps(text: str, models: List[str]) -> Iterator[Tuple[Dict, Optional[str]]]:
+    """
+    Paraphrase the original text with each model INDEPENDENTLY. The steps
+    don't depend on each other but don't run concurrently either: the
+    paraphraser keeps one model resident and the pool runs one model group
+    at a time, so the models run one after another, starting with the one
+    already loaded to save a swap
+
+    Args:
+        text: Original text
+        models: Paraphrasing models
+
+    Yields:
+        Tuple of (step_result, error) in the order the models ran
+    """
+    current_model = get_current_model()
+    order = sorted(range(len(models)), key=lambda i: models[i] != current_model)
+    
+    original_length = len(text)
+    for i in order:
+        model_name = models[i]
+        model_start_ns = time.perf_counter_ns()
+        try:
+            paraphrased_text, error = paraphrase_pool.submit(text, model_name)
+        except Exception as e:
+            logger.error("Error with model %s: %s", model_name, e)
+            paraphrased_text, error = "", str(e)
+        model_ms = (time.perf_counter_ns() - model_start_ns) // 1_000_000
+        
+        output_text = paraphrased_text if paraphrased_text and paraphrased_text.strip() else text
+        output_length = len(output_text)
+        
+        yield {
+            "step": i + 1,
+            "model": model_name,
+            "output_text": output_text,
+            "output_length": output_length,
+            "length_change": output_length - original_length,
+            "processing_time": model_ms / 1000,
+            "success": not error
+        }, error
+
+def _parallel_steps(text: str, models: List[str]) -> Iterator[Tuple[Dict, Optional[str]]]:
+    """Fan-out steps shaped like _pipeline_steps results, every step reading the original text"""
+    input_length = len(text)
+    for result, error in _fanout_steps(text, models):
+        step = {
+            "step": result["step"],
+            "model": result["model"],
+            "input_text": text,
+            "input_length": input_length,
+            **{k: v for k, v in result.items() if k not in ("step", "model")}
+        }
+        yield step, f"Step {result['step']} ({result['model']}): {error}" if error else None
+
+def _compact_steps(text: str, results: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """
+    Split pipeline step results into per-step metadata and one list of texts.
+    Each step's input is the original text or the previous step's output, so
+    repeating it per step would double the response size.
+
+    Args:
+        text: Original text
+        results: Step results from _pipeline_steps or _parallel_steps, in step order
+
+    Returns:
+        Tuple of (steps without their texts, stage_texts) where stage_texts[0]
+        is the original text and stage_texts[i] is step i's output
+    """
+    steps = [{k: v for k, v in r.items() if k not in ("input_text", "output_text")} for r in results]
+    return steps, [text] + [r["output_text"] for r in results]
+
+def _event_stream(events: Iterator[Dict]) -> Response:
+    """
+    Send each event as a Server-Sent Event as soon as it is produced
+
+    Args:
+        events: Generator of JSON-serializable event bodies
+    """
+    def generate():
+        try:
+            # Bytes chunks avoid re-encoding large step texts
+            for event in events:
+                yield b"data: " + _json_bytes(event) + b"\n\n"
+        except Exception as e:
+            logger.error("Error streaming response: %s", e)
+            yield b"data: " + _json_bytes({'error': str(e)}) + b"\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _run_pipeline(steps: Iterator[Tuple[Dict, Optional[str]]], build_response: Callable[[List[Dict], List[str]], Dict]):
+    """
+    Respond with the pipeline results, either as one JSON body or, with
+    ?stream=true, as Server-Sent Events: one per step followed by a final
+    event carrying the full response
+
+    Args:
+        steps: Generator from _pipeline_steps
+        build_response: Builds the response body from the step results and errors
+    """
+    if request.args.get('stream', '').lower() != 'true':
+        results, errors = [], []
+        for result, error in steps:
+            results.append(result)
+            if error:
+                errors.append(error)
+        return jsonify(build_response(results, errors))
+
+    def events():
+        results, errors = [], []
+        for result, error in steps:
+            results.append(result)
+            if error:
+                errors.append(error)
+            yield result
+        yield {'final': build_response(results, errors)}
+
+    return _event_stream(events())
+
+@app.route('/paraphrase_multi', methods=['POST'])
+@json_endpoint(min_len=10, max_len=MAX_TEXT_LENGTH)
+def paraphrase_multi_handler(data):
+    """Paraphrase text through 2 best models in PIPELINE (each model processes previous output)"""
+    try:
+        text = data['text']
         
-        return jsonify({
-            "pipeline_results": results,
-            "success": True,
-            "original_text": text,
-            "final_text": current_text,  # Final output after all pipeline steps
-            "models_used": [r["model"] for r in results],
-            "errors": errors if errors else None,
-            "statistics": {
-                "pipeline_steps": len(results),
-                "successful_steps": len([r for r in results if r.get("success", False)]),
-                "failed_steps": len([r for r in results if not r.get("success", False)]),
-                "original_length": len(text),
-                "final_length": len(current_text),
-                "total_length_change": len(current_text) - len(text),
-                "pipeline_mode": "sequential"
+        models_to_use = refresh_model_state()['best_pair']
+        
+        if not models_to_use:
+            return jsonify({"error": "No models available for paraphrasing"}), 500
+        
+        def build_response(results, errors):
+            final_text = results[-1]["output_text"] if results else text
+            original_length, final_length = len(text), len(final_text)
+            steps, stage_texts = _compact_steps(text, results)
+            return {
+                "pipeline_results": steps,
+                "stage_texts": stage_texts,
+                "success": True,
+                "original_text": text,
+                "final_text": final_text,  # Final output after all pipeline steps
+                "models_used": [r["model"] for r in results],
+                "errors": errors if errors else None,
+                "statistics": {
+                    "pipeline_steps": len(results),
+                    "successful_steps": len([r for r in results if r.get("success", False)]),
+                    "failed_steps": len([r for r in results if not r.get("success", False)]),
+                    "original_length": original_length,
+                    "final_length": final_length,
+                    "total_length_change": final_length - original_length,
+                    "pipeline_mode": "sequential"
+                }
             }
-        })
+        
+        return _run_pipeline(_pipeline_steps(text, models_to_use), build_response)
 
     except Exception as e:
-        logger.error(f"Error in /paraphrase_multi: {str(e)}")
+        logger.error("Error in /paraphrase_multi: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/paraphrase_all', methods=['POST'])
-def paraphrase_all_handler():
-    """Paraphrase text through ALL available models in PIPELINE (each model processes previous output)"""
+@json_endpoint(min_len=10, max_len=MAX_TEXT_LENGTH)
+def paraphrase_all_handler(data):
+    """Paraphrase text through ALL available models in PIPELINE (each model processes previous output),
+    or with pipeline_mode="parallel" run every model on the original text independently"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
+        available_models = refresh_model_state()['available']
         
-        if len(text) < 10:
-            return jsonify({"error": "Text must be at least 10 characters long"}), 400
+        if not available_models:
+            return jsonify({"error": "No models available for paraphrasing"}), 500
         
-        if len(text) > 50000:  # Changed from 5000 to 50000
-            return jsonify({"error": "Text must be less than 50000 characters"}), 400
+        pipeline_mode = data.get("pipeline_mode", "sequential")
+        if pipeline_mode not in ("sequential", "parallel"):
+            return jsonify({"error": "pipeline_mode must be 'sequential' or 'parallel'"}), 400
+        
+        processing_start_ns = time.perf_counter_ns()
+        
+        def build_response(results, errors):
+            # Parallel steps finish out of order
+            results = sorted(results, key=lambda r: r["step"])
+            # Failed steps pass their input through, so the last successful output is the result in both modes
+            final_text = next((r["output_text"] for r in reversed(results) if r.get("success")), text)
+            original_length, final_length = len(text), len(final_text)
+            total_ms = (time.perf_counter_ns() - processing_start_ns) // 1_000_000
+            steps, stage_texts = _compact_steps(text, results)
+            successful_steps = [r for r in steps if r.get("success", False)]
+            return {
+                "pipeline_results": steps,
+                "stage_texts": stage_texts,
+                "successful_steps": successful_steps,
+                "success": len(successful_steps) > 0,
+                "original_text": text,
+                "final_text": final_text,  # Final output after all pipeline steps
+                "models_attempted": available_models,
+                "errors": errors if errors else None,
+                "statistics": {
+                    "pipeline_steps": len(results),
+                    "successful_steps": len(successful_steps),
+                    "failed_steps": len(results) - len(successful_steps),
+                    "original_length": original_length,
+                    "final_length": final_length,
+                    "total_length_change": final_length - original_length,
+                    "total_processing_time": total_ms / 1000,
+                    "average_processing_time": total_ms // len(results) / 1000 if results else 0,
+                    "pipeline_mode": pipeline_mode
+                }
+            }
         
-        available_models = get_available_models()
+        if pipeline_mode == "parallel":
+            steps = _parallel_steps(text, available_models)
+        else:
+            steps = _pipeline_steps(text, available_models, timed=True)
         
-        if not available_models:
-            return jsonify({"error": "No models available for paraphrasing"}), 500
+        return _run_pipeline(steps, build_response)
+
+    except Exception as e:
+        logger.error("Error in /paraphrase_all: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/paraphrase_fanout', methods=['POST'])
+@json_endpoint(min_len=10, max_len=MAX_TEXT_LENGTH)
+def paraphrase_fanout_handler(data):
+    """Paraphrase the original text with several models INDEPENDENTLY (no pipelining)"""
+    try:
+        text = data['text']
+        
+        available_models = refresh_model_state()['available']
+        requested_models = data.get('models') or available_models
+        models_to_use = [model for model in requested_models if model in available_models]
+        
+        if not models_to_use:
+            return jsonify({
+                "error": "No models available for paraphrasing",
+                "available_models": available_models
+            }), 400
+        
+        processing_start_ns = time.perf_counter_ns()
         
         results = []
         errors = []
-        current_text = text  # Start with original text
-        processing_time_start = time.time()
-        
-        for i, model_name in enumerate(available_models):
-            model_start_time = time.time()
-            try:
-                logger.info(f"Pipeline step {i+1}/{len(available_models)}: Paraphrasing with model {model_name}")
-                paraphrased_text, error = paraphrase_text(current_text, model_name)
-                
-                model_time = time.time() - model_start_time
-                
-                if error:
-                    errors.append(f"Step {i+1} ({model_name}): {error}")
-                    # On error, continue with current text (don't break the pipeline)
-                    paraphrased_text = current_text
-                
-                # Clean up common formatting issues
-                if paraphrased_text and paraphrased_text.startswith(": "):
-                    paraphrased_text = paraphrased_text[2:]
-                
-                # If paraphrasing failed, use current text
-                if not paraphrased_text or not paraphrased_text.strip():
-                    paraphrased_text = current_text
-                
-                results.append({
-                    "step": i + 1,
-                    "model": model_name,
-                    "input_text": current_text,
-                    "output_text": paraphrased_text,
-                    "input_length": len(current_text),
-                    "output_length": len(paraphrased_text),
-                    "length_change": len(paraphrased_text) - len(current_text),
-                    "processing_time": round(model_time, 2),
-                    "success": not error
-                })
-                
-                # Update current_text for next iteration (PIPELINE EFFECT)
-                current_text = paraphrased_text
-                
-            except Exception as e:
-                model_time = time.time() - model_start_time
-                logger.error(f"Error with model {model_name}: {str(e)}")
-                errors.append(f"Step {i+1} ({model_name}): {str(e)}")
-                
-                # Continue with current text on error
-                results.append({
-                    "step": i + 1,
-                    "model": model_name,
-                    "input_text": current_text,
-                    "output_text": current_text,  # No change on error
-                    "input_length": len(current_text),
-                    "output_length": len(current_text),
-                    "length_change": 0,
-                    "processing_time": round(model_time, 2),
-                    "success": False,
-                    "error": str(e)
-                })
+        for result, error in _fanout_steps(text, models_to_use):
+            results.append(result)
+            if error:
+                errors.append((result["step"], f"{result['model']}: {error}"))
         
-        total_processing_time = time.time() - processing_time_start
-        successful_steps = [r for r in results if r.get("success", False)]
+        results.sort(key=lambda r: r["step"])
+        errors = [message for _, message in sorted(errors)]
+        successful_results = [r for r in results if r["success"]]
+        total_ms = (time.perf_counter_ns() - processing_start_ns) // 1_000_000
         
         return jsonify({
-            "pipeline_results": results,
-            "successful_steps": successful_steps,
-            "success": len(successful_steps) > 0,
+            "results": results,
+            "success": len(successful_results) > 0,
             "original_text": text,
-            "final_text": current_text,  # Final output after all pipeline steps
-            "models_attempted": available_models,
+            "models_used": models_to_use,
             "errors": errors if errors else None,
             "statistics": {
-                "pipeline_steps": len(results),
-                "successful_steps": len(successful_steps),
-                "failed_steps": len(results) - len(successful_steps),
+                "models_run": len(results),
+                "successful_models": len(successful_results),
+                "failed_models": len(results) - len(successful_results),
                 "original_length": len(text),
-                "final_length": len(current_text),
-                "total_length_change": len(current_text) - len(text),
-                "total_processing_time": round(total_processing_time, 2),
-                "average_processing_time": round(total_processing_time / len(available_models), 2) if available_models else 0,
-                "pipeline_mode": "sequential"
+                "total_processing_time": total_ms / 1000,
+                "pipeline_mode": "fanout"
             }
         })
 
     except Exception as e:
-        logger.error(f"Error in /paraphrase_all: {str(e)}")
+        logger.error("Error in /paraphrase_fanout: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # AI detection endpoints
 @app.route('/detect', methods=['POST'])
-def detect_ai_handler():
+@json_endpoint(min_len=20, max_len=MAX_TEXT_LENGTH)
+def detect_ai_handler(data):
     """Main AI detection endpoint using ensemble method with enhanced options"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.7)
         models = data.get('models', None)  # Optional specific models
         use_all_models = data.get('use_all_models', False)  # New option
         top_n = data.get('top_n', None)  # New option for top N models
         criteria = data.get('criteria', 'performance')  # New option for model selection criteria
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 20:
-            return jsonify({"error": "Text must be at least 20 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 10000 to 50000
-            return jsonify({"error": "Text must be less than 50,000 characters"}), 400
-        
         # Get detection results based on options
         if use_all_models:
             result = detect_with_all_models(text)
@@ -696,224 +1120,110 @@ def detect_ai_handler():
             result = detect_with_selected_models(text, models)
         else:
             # Default ensemble method
-            detector = AITextDetector()
-            result = detector.detect_ensemble(text, models=models)
-        
-        # Add simple classification
-        is_ai = result['ensemble_ai_probability'] > threshold
+            result = ai_detector.detect_ensemble(text, models=models)
         
-        response = {
-            "text_preview": text[:100] + "..." if len(text) > 100 else text,
-            "is_ai_generated": is_ai,
-            "ai_probability": result['ensemble_ai_probability'],
-            "human_probability": result['ensemble_human_probability'],
-            "prediction": result['prediction'],
-            "confidence": result['confidence'],
-            "threshold_used": threshold,
-            "models_used": result['models_used'],
-            "individual_results": result['individual_results'],
-            "text_length": len(text),
-            "detection_method": "all_models" if use_all_models else f"top_{top_n}" if top_n else "selected" if models else "default",
-            "success": True
-        }
+        detection_method = "all_models" if use_all_models else f"top_{top_n}" if top_n else "selected" if models else "default"
+        response = _detection_response(text, result, threshold, data.get("return_individual", True), detection_method=detection_method)
         
-        logger.info(f"AI detection completed: {result['prediction']} ({result['ensemble_ai_probability']:.3f})")
+        logger.info("AI detection completed: %s (%.3f)", result['prediction'], result['ensemble_ai_probability'])
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in AI detection: {str(e)}")
+        logger.error("Error in AI detection: %s", e)
         return jsonify({
             "error": "Failed to analyze text",
             "success": False
         }), 500
 
 @app.route('/detect_all_models', methods=['POST'])
-def detect_all_models_handler():
+@json_endpoint(min_len=20, max_len=MAX_TEXT_LENGTH)
+def detect_all_models_handler(data):
     """Detect AI text using ALL available models"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.7)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 20:
-            return jsonify({"error": "Text must be at least 20 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 10000 to 50000
-            return jsonify({"error": "Text must be less than 50,000 characters"}), 400
-        
         # Use all available models
         result = detect_with_all_models(text)
-        is_ai = result['ensemble_ai_probability'] > threshold
+        response = _detection_response(text, result, threshold, data.get("return_individual", True), total_models_used=len(result['models_used']), detection_method="all_models")
         
-        response = {
-            "text_preview": text[:100] + "..." if len(text) > 100 else text,
-            "is_ai_generated": is_ai,
-            "ai_probability": result['ensemble_ai_probability'],
-            "human_probability": result['ensemble_human_probability'],
-            "prediction": result['prediction'],
-            "confidence": result['confidence'],
-            "threshold_used": threshold,
-            "models_used": result['models_used'],
-            "individual_results": result['individual_results'],
-            "total_models_used": len(result['models_used']),
-            "detection_method": "all_models",
-            "text_length": len(text),
-            "success": True
-        }
-        
-        logger.info(f"All models detection: {result['prediction']} with {len(result['models_used'])} models")
+        logger.info("All models detection: %s with %d models", result['prediction'], len(result['models_used']))
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in all models detection: {str(e)}")
+        logger.error("Error in all models detection: %s", e)
         return jsonify({
             "error": "Failed to analyze text with all models",
             "success": False
         }), 500
 
 @app.route('/detect_selected', methods=['POST'])
-def detect_selected_models_handler():
+@json_endpoint(min_len=20, max_len=MAX_TEXT_LENGTH)
+def detect_selected_models_handler(data):
     """Detect AI text using specific selected models"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         models = data.get('models', [])
         threshold = data.get('threshold', 0.7)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
         if not models or not isinstance(models, list):
             return jsonify({"error": "Models list is required"}), 400
         
-        if len(text) < 20:
-            return jsonify({"error": "Text must be at least 20 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 10000 to 50000
-            return jsonify({"error": "Text must be less than 50,000 characters"}), 400
-        
         # Use selected models
         result = detect_with_selected_models(text, models)
-        is_ai = result['ensemble_ai_probability'] > threshold
+        response = _detection_response(text, result, threshold, data.get("return_individual", True), models_requested=models, detection_method="selected_models")
         
-        response = {
-            "text_preview": text[:100] + "..." if len(text) > 100 else text,
-            "is_ai_generated": is_ai,
-            "ai_probability": result['ensemble_ai_probability'],
-            "human_probability": result['ensemble_human_probability'],
-            "prediction": result['prediction'],
-            "confidence": result['confidence'],
-            "threshold_used": threshold,
-            "models_requested": models,
-            "models_used": result['models_used'],
-            "individual_results": result['individual_results'],
-            "detection_method": "selected_models",
-            "text_length": len(text),
-            "success": True
-        }
-        
-        logger.info(f"Selected models detection: {result['prediction']} with models {result['models_used']}")
+        logger.info("Selected models detection: %s with models %s", result['prediction'], result['models_used'])
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in selected models detection: {str(e)}")
+        logger.error("Error in selected models detection: %s", e)
         return jsonify({
             "error": "Failed to analyze text with selected models",
             "success": False
         }), 500
 
 @app.route('/detect_top_models', methods=['POST'])
-def detect_top_models_handler():
+@json_endpoint(min_len=20, max_len=MAX_TEXT_LENGTH)
+def detect_top_models_handler(data):
     """Detect AI text using top N models based on criteria"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         n = data.get('n', 3)
         criteria = data.get('criteria', 'performance')
         threshold = data.get('threshold', 0.7)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
         if not isinstance(n, int) or n < 1 or n > 8:
             return jsonify({"error": "n must be an integer between 1 and 8"}), 400
         
         if criteria not in ['performance', 'speed', 'accuracy']:
             return jsonify({"error": "criteria must be 'performance', 'speed', or 'accuracy'"}), 400
         
-        if len(text) < 20:
-            return jsonify({"error": "Text must be at least 20 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 10000 to 50000
-            return jsonify({"error": "Text must be less than 50,000 characters"}), 400
-        
         # Use top N models
         result = detect_with_top_models(text, n=n, criteria=criteria)
-        is_ai = result['ensemble_ai_probability'] > threshold
+        response = _detection_response(text, result, threshold, data.get("return_individual", True), selection_criteria=criteria, top_n=n, detection_method=f"top_{n}_{criteria}")
         
-        response = {
-            "text_preview": text[:100] + "..." if len(text) > 100 else text,
-            "is_ai_generated": is_ai,
-            "ai_probability": result['ensemble_ai_probability'],
-            "human_probability": result['ensemble_human_probability'],
-            "prediction": result['prediction'],
-            "confidence": result['confidence'],
-            "threshold_used": threshold,
-            "models_used": result['models_used'],
-            "individual_results": result['individual_results'],
-            "selection_criteria": criteria,
-            "top_n": n,
-            "detection_method": f"top_{n}_{criteria}",
-            "text_length": len(text),
-            "success": True
-        }
-        
-        logger.info(f"Top {n} {criteria} models detection: {result['prediction']}")
+        logger.info("Top %s %s models detection: %s", n, criteria, result['prediction'])
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in top models detection: {str(e)}")
+        logger.error("Error in top models detection: %s", e)
         return jsonify({
             "error": "Failed to analyze text with top models",
             "success": False
         }), 500
 
 @app.route('/detect_lines', methods=['POST'])
-def detect_lines_handler():
+@json_endpoint(min_len=50, max_len=MAX_SEGMENT_TEXT_LENGTH, purpose='line detection')
+def detect_lines_handler(data):
     """Detect which specific lines in text are AI-generated"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.6)
         min_line_length = data.get('min_line_length', 20)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 50:
-            return jsonify({"error": "Text must be at least 50 characters long for line detection"}), 400
-        
-        if len(text) > 15000:
-            return jsonify({"error": "Text must be less than 15,000 characters for line detection"}), 400
-        
         # Detect AI lines
-        detector = AITextDetector()
-        result = detector.detect_ai_lines(text, threshold, min_line_length)
+        result = ai_detector.detect_ai_lines(text, threshold, min_line_length)
         
         response = {
             "ai_detected_lines": result['ai_detected_lines'],
@@ -926,39 +1236,26 @@ def detect_lines_handler():
             "success": True
         }
         
-        logger.info(f"Line detection: {result['statistics']['ai_generated_lines']}/{result['statistics']['total_lines_analyzed']} lines detected as AI")
+        logger.info("Line detection: %d/%d lines detected as AI", result['statistics']['ai_generated_lines'], result['statistics']['total_lines_analyzed'])
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in line detection: {str(e)}")
+        logger.error("Error in line detection: %s", e)
         return jsonify({
             "error": "Failed to detect AI lines",
             "success": False
         }), 500
 
 @app.route('/detect_sentences', methods=['POST'])
-def detect_sentences_handler():
+@json_endpoint(min_len=50, max_len=MAX_SEGMENT_TEXT_LENGTH, purpose='sentence detection')
+def detect_sentences_handler(data):
     """Detect which specific sentences in text are AI-generated"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.6)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 50:
-            return jsonify({"error": "Text must be at least 50 characters long for sentence detection"}), 400
-        
-        if len(text) > 15000:
-            return jsonify({"error": "Text must be less than 15,000 characters for sentence detection"}), 400
-        
         # Detect AI sentences
-        detector = AITextDetector()
-        result = detector.detect_ai_sentences(text, threshold)
+        result = ai_detector.detect_ai_sentences(text, threshold)
         
         response = {
             "ai_detected_sentences": result['ai_detected_sentences'],
@@ -970,46 +1267,31 @@ def detect_sentences_handler():
             "success": True
         }
         
-        logger.info(f"Sentence detection: {result['statistics']['ai_generated_sentences']}/{result['statistics']['total_sentences_analyzed']} sentences detected as AI")
+        logger.info("Sentence detection: %d/%d sentences detected as AI", result['statistics']['ai_generated_sentences'], result['statistics']['total_sentences_analyzed'])
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in sentence detection: {str(e)}")
+        logger.error("Error in sentence detection: %s", e)
         return jsonify({
             "error": "Failed to detect AI sentences",
             "success": False
         }), 500
 
 @app.route('/highlight_ai', methods=['POST'])
-def highlight_ai_handler():
+@json_endpoint(min_len=50, max_len=MAX_SEGMENT_TEXT_LENGTH, purpose='highlighting')
+def highlight_ai_handler(data):
     """Highlight AI-detected portions in text"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.6)
         output_format = data.get('format', 'markdown')
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
         if output_format not in ['markdown', 'html', 'plain']:
             return jsonify({"error": "format must be 'markdown', 'html', or 'plain'"}), 400
         
-        if len(text) < 50:
-            return jsonify({"error": "Text must be at least 50 characters long for highlighting"}), 400
-        
-        if len(text) > 15000:
-            return jsonify({"error": "Text must be less than 15,000 characters for highlighting"}), 400
-        
-        # Highlight AI text
-        highlighted_text = highlight_ai_text(text, threshold, output_format)
-        
-        # Also get sentence analysis for additional info
-        detector = AITextDetector()
-        sentence_result = detector.detect_ai_sentences(text, threshold)
+        # One sentence analysis feeds both the highlighting and the counts
+        sentence_result = ai_detector.detect_ai_sentences(text, threshold)
+        highlighted_text = highlight_ai_text(text, threshold, output_format, sentence_result)
         
         response = {
             "original_text": text,
@@ -1023,37 +1305,27 @@ def highlight_ai_handler():
             "success": True
         }
         
-        logger.info(f"Text highlighting completed: {len(sentence_result['ai_detected_sentences'])} AI sentences highlighted")
+        logger.info("Text highlighting completed: %d AI sentences highlighted", len(sentence_result['ai_detected_sentences']))
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in text highlighting: {str(e)}")
+        logger.error("Error in text highlighting: %s", e)
         return jsonify({
             "error": "Failed to highlight AI text",
             "success": False
         }), 500
 
 @app.route('/get_ai_lines_simple', methods=['POST'])
-def get_ai_lines_simple_handler():
+@json_endpoint(min_len=50)
+def get_ai_lines_simple_handler(data):
     """Simple endpoint to get just the AI-detected lines with line numbers"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.6)
         min_line_length = data.get('min_line_length', 20)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 50:
-            return jsonify({"error": "Text must be at least 50 characters long"}), 400
-        
         # Get full AI lines detection result
-        detector = AITextDetector()
-        result = detector.detect_ai_lines(text, threshold, min_line_length)
+        result = ai_detector.detect_ai_lines(text, threshold, min_line_length)
         
         response = {
             "ai_lines": result['ai_detected_lines'],  # Full details with line numbers
@@ -1069,29 +1341,20 @@ def get_ai_lines_simple_handler():
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error getting AI lines: {str(e)}")
+        logger.error("Error getting AI lines: %s", e)
         return jsonify({
             "error": "Failed to get AI lines",
             "success": False
         }), 500
 
 @app.route('/get_ai_sentences_simple', methods=['POST'])
-def get_ai_sentences_simple_handler():
+@json_endpoint(min_len=50)
+def get_ai_sentences_simple_handler(data):
     """Simple endpoint to get just the AI-detected sentences"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.6)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 50:
-            return jsonify({"error": "Text must be at least 50 characters long"}), 400
-        
         # Get AI sentences
         ai_sentences = get_ai_sentences(text, threshold)
         
@@ -1106,118 +1369,118 @@ def get_ai_sentences_simple_handler():
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error getting AI sentences: {str(e)}")
+        logger.error("Error getting AI sentences: %s", e)
         return jsonify({
             "error": "Failed to get AI sentences",
             "success": False
         }), 500
 
+# Descriptions and rankings shown by /detect_models
+DETECTION_MODEL_INFO = {
+    "roberta-base-openai-detector": {
+        "name": "roberta-base-openai-detector",
+        "description": "OpenAI's RoBERTa base detector",
+        "type": "base",
+        "performance_rank": 4,
+        "speed_rank": 1,
+        "accuracy_rank": 4
+    },
+    "roberta-large-openai-detector": {
+        "name": "roberta-large-openai-detector",
+        "description": "OpenAI's RoBERTa large detector",
+        "type": "large",
+        "performance_rank": 2,
+        "speed_rank": 5,
+        "accuracy_rank": 2
+    },
+    "chatgpt-detector": {
+        "name": "chatgpt-detector",
+        "description": "Specialized ChatGPT detector",
+        "type": "specialized",
+        "performance_rank": 3,
+        "speed_rank": 3,
+        "accuracy_rank": 3
+    },
+    "mixed-detector": {
+        "name": "mixed-detector",
+        "description": "Mixed AI content detector",
+        "type": "general",
+        "performance_rank": 1,
+        "speed_rank": 4,
+        "accuracy_rank": 1
+    },
+    "multilingual-detector": {
+        "name": "multilingual-detector",
+        "description": "Multilingual AI detection",
+        "type": "multilingual",
+        "performance_rank": 5,
+        "speed_rank": 6,
+        "accuracy_rank": 5
+    },
+    "distilbert-detector": {
+        "name": "distilbert-detector",
+        "description": "Fast DistilBERT-based detector",
+        "type": "fast",
+        "performance_rank": 6,
+        "speed_rank": 2,
+        "accuracy_rank": 6
+    },
+    "bert-detector": {
+        "name": "bert-detector",
+        "description": "BERT-based classification detector",
+        "type": "classification",
+        "performance_rank": 7,
+        "speed_rank": 7,
+        "accuracy_rank": 7
+    }
+}
+
+def _detect_models_body() -> bytes:
+    """Serialize the /detect_models response; the detector list is fixed at import"""
+    available_models = get_detection_models()
+    detailed_models = [DETECTION_MODEL_INFO.get(model, {"name": model, "description": "Unknown model"}) for model in available_models]
+    return _json_bytes({
+        "available_models": detailed_models,
+        "total_models": len(available_models),
+        "default_ensemble": ["chatgpt-detector", "mixed-detector"],
+        "recommended_single": "mixed-detector",
+        "recommended_fast": "roberta-base-openai-detector",
+        "recommended_accurate": "mixed-detector",
+        "selection_criteria": {
+            "performance": "Best overall detection capability",
+            "speed": "Fastest processing time",
+            "accuracy": "Most accurate detection"
+        }
+    })
+
+_DETECT_MODELS_BODY = _detect_models_body()
+
 @app.route('/detect_models', methods=['GET'])
 def get_detection_models_endpoint():
     """Get available AI detection models with enhanced information"""
-    try:
-        available_models = get_detection_models()
-        
-        model_info = {
-            "roberta-base-openai-detector": {
-                "name": "roberta-base-openai-detector",
-                "description": "OpenAI's RoBERTa base detector",
-                "type": "base",
-                "performance_rank": 4,
-                "speed_rank": 1,
-                "accuracy_rank": 4
-            },
-            "roberta-large-openai-detector": {
-                "name": "roberta-large-openai-detector", 
-                "description": "OpenAI's RoBERTa large detector",
-                "type": "large",
-                "performance_rank": 2,
-                "speed_rank": 5,
-                "accuracy_rank": 2
-            },
-            "chatgpt-detector": {
-                "name": "chatgpt-detector",
-                "description": "Specialized ChatGPT detector",
-                "type": "specialized",
-                "performance_rank": 3,
-                "speed_rank": 3,
-                "accuracy_rank": 3
-            },
-            "mixed-detector": {
-                "name": "mixed-detector",
-                "description": "Mixed AI content detector",
-                "type": "general",
-                "performance_rank": 1,
-                "speed_rank": 4,
-                "accuracy_rank": 1
-            },
-            "multilingual-detector": {
-                "name": "multilingual-detector",
-                "description": "Multilingual AI detection",
-                "type": "multilingual",
-                "performance_rank": 5,
-                "speed_rank": 6,
-                "accuracy_rank": 5
-            },
-            "distilbert-detector": {
-                "name": "distilbert-detector",
-                "description": "Fast DistilBERT-based detector",
-                "type": "fast",
-                "performance_rank": 6,
-                "speed_rank": 2,
-                "accuracy_rank": 6
-            },
-            "bert-detector": {
-                "name": "bert-detector",
-                "description": "BERT-based classification detector",
-                "type": "classification",
-                "performance_rank": 7,
-                "speed_rank": 7,
-                "accuracy_rank": 7
-            }
-        }
-        
-        detailed_models = [model_info.get(model, {"name": model, "description": "Unknown model"}) for model in available_models]
-        
-        return jsonify({
-            "available_models": detailed_models,
-            "total_models": len(available_models),
-            "default_ensemble": ["chatgpt-detector", "mixed-detector"],
-            "recommended_single": "mixed-detector",
-            "recommended_fast": "roberta-base-openai-detector",
-            "recommended_accurate": "mixed-detector",
-            "selection_criteria": {
-                "performance": "Best overall detection capability",
-                "speed": "Fastest processing time",
-                "accuracy": "Most accurate detection"
-            }
-        })
-        
-    except Exception as e:
-        logger.error(f"Error getting detection models: {str(e)}")
-        return jsonify({
-            "error": "Failed to get detection models",
-            "success": False
-        }), 500
+    return Response(_DETECT_MODELS_BODY, mimetype='application/json')
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats_endpoint():
+    """Entry counts and hit/miss counters of the detection and humanization caches"""
+    return jsonify({
+        "detection": ai_detector.cache_stats(),
+        "humanization": humanizer_service.cache.stats()
+    })
+
+@app.route('/clear_cache', methods=['POST'])
+def clear_cache_endpoint():
+    """Drop every cached detection and humanization result"""
+    ai_detector.clear_cache()
+    humanizer_service.cache.clear()
+    return jsonify({"message": "Caches cleared", "success": True})
 
 @app.route('/humanize_and_check', methods=['POST'])
-def humanize_and_check_handler():
+@json_endpoint(min_len=10, max_len=MAX_TEXT_LENGTH)
+def humanize_and_check_handler(data):
     """Humanize text and then check if it passes AI detection"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
-        
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 10:
-            return jsonify({"error": "Text must be at least 10 characters long"}), 400
-        
-        if len(text) > 50000:  # Changed from 5000 to 50000
-            return jsonify({"error": "Text must be less than 50000 characters"}), 400
+        text = data['text']
         
         # Extract humanization options
         use_paraphrasing = data.get("paraphrasing", True)
@@ -1225,31 +1488,48 @@ def humanize_and_check_handler():
         paraphrase_model = data.get("model", None)
         detection_threshold = data.get("detection_threshold", 0.7)
         
-        # Step 1: Check original text
+        # Step 1: Check the original text
         logger.info("Checking original text for AI detection")
-        original_detection = detect_ai_text(text, method="ensemble")
-        original_is_ai, original_confidence = is_ai_generated(text, detection_threshold)
+        original_detection = detect_ai_text_batch([text], method="ensemble")[0]
         
-        # Step 2: Humanize the text
-        logger.info("Humanizing text")
-        humanized_text, humanization_stats = humanizer_service.humanize_text(
-            text=text,
-            use_paraphrasing=use_paraphrasing,
-            use_enhanced_rewriting=use_enhanced,
-            paraphrase_model=paraphrase_model
-        )
+        if original_detection['ensemble_ai_probability'] < detection_threshold - CASCADE_MARGIN:
+            # Clearly below the threshold: nothing to humanize or re-check
+            cascade = "early_exit"
+            humanized_text = text
+            humanized_detection = original_detection
+            humanization_stats = {
+                "original_length": len(text),
+                "final_length": len(text),
+                "length_change": 0,
+                "processing_steps": [],
+                "skipped_reason": "below_threshold"
+            }
+        else:
+            # Step 2: Humanize the text
+            cascade = "full"
+            logger.info("Humanizing text")
+            humanized_text, humanization_stats = humanizer_service.humanize_text(
+                text=text,
+                use_paraphrasing=use_paraphrasing,
+                use_enhanced_rewriting=use_enhanced,
+                paraphrase_model=paraphrase_model
+            )
+            
+            # Step 3: Score both texts in one batched pass per model; the original's
+            # per-model scores are served from the detector's score cache
+            logger.info("Checking original and humanized text for AI detection")
+            original_detection, humanized_detection = detect_ai_text_batch([text, humanized_text], method="ensemble")
         
-        # Step 3: Check humanized text
-        logger.info("Checking humanized text for AI detection")
-        humanized_detection = detect_ai_text(humanized_text, method="ensemble")
-        humanized_is_ai, humanized_confidence = is_ai_generated(humanized_text, detection_threshold)
+        original_is_ai = original_detection['ensemble_ai_probability'] > detection_threshold
+        original_confidence = original_detection['confidence']
+        humanized_is_ai = humanized_detection['ensemble_ai_probability'] > detection_threshold
+        humanized_confidence = humanized_detection['confidence']
         
         # Calculate improvement
         ai_prob_reduction = original_detection['ensemble_ai_probability'] - humanized_detection['ensemble_ai_probability']
         detection_improved = original_is_ai and not humanized_is_ai
         
         response = {
-            "original_text": text,
             "humanized_text": humanized_text,
             "humanization_stats": humanization_stats,
             "original_detection": {
@@ -1270,14 +1550,18 @@ def humanize_and_check_handler():
                 "percentage_improvement": (ai_prob_reduction / original_detection['ensemble_ai_probability'] * 100) if original_detection['ensemble_ai_probability'] > 0 else 0
             },
             "threshold_used": detection_threshold,
+            "cascade": cascade,
             "success": True
         }
+        # The caller already has the input; echo it back only when asked
+        if request.args.get('include_original', '').lower() in ('1', 'true'):
+            response["original_text"] = text
         
-        logger.info(f"Humanization and detection completed. Improved: {detection_improved}, Reduction: {ai_prob_reduction:.3f}")
+        logger.info("Humanization and detection completed. Improved: %s, Reduction: %.3f", detection_improved, ai_prob_reduction)
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in humanize and check: {str(e)}")
+        logger.error("Error in humanize and check: %s", e)
         return jsonify({
             "error": "Failed to humanize and check text",
             "success": False
@@ -1291,26 +1575,16 @@ def rewrite_handler():
     return humanize_handler()
 
 @app.route('/get_ai_lines_detailed', methods=['POST'])
-def get_ai_lines_detailed_handler():
+@json_endpoint(min_len=50)
+def get_ai_lines_detailed_handler(data):
     """Get detailed AI-detected lines with line numbers and probabilities"""
     try:
-        if not request.is_json:
-            return jsonify({"error": "Content-Type must be application/json"}), 400
-            
-        data = request.get_json()
-        text = data.get('text', '').strip()
+        text = data['text']
         threshold = data.get('threshold', 0.6)
         min_line_length = data.get('min_line_length', 20)
         
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-        
-        if len(text) < 50:
-            return jsonify({"error": "Text must be at least 50 characters long"}), 400
-        
         # Get full AI lines detection result
-        detector = AITextDetector()
-        result = detector.detect_ai_lines(text, threshold, min_line_length)
+        result = ai_detector.detect_ai_lines(text, threshold, min_line_length)
         
         # Format the AI lines with more readable structure
         formatted_ai_lines = []
@@ -1325,7 +1599,7 @@ def get_ai_lines_detailed_handler():
         response = {
             "ai_detected_lines": formatted_ai_lines,
             "summary": {
-                "total_lines_in_text": len(text.split('\n')),
+                "total_lines_in_text": text.count('\n') + 1,
                 "lines_analyzed": result['statistics']['total_lines_analyzed'],
                 "ai_lines_found": result['statistics']['ai_generated_lines'],
                 "ai_percentage": round(result['statistics']['ai_percentage'], 2)
@@ -1340,20 +1614,71 @@ def get_ai_lines_detailed_handler():
         return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error getting detailed AI lines: {str(e)}")
+        logger.error("Error getting detailed AI lines: %s", e)
         return jsonify({
             "error": "Failed to get detailed AI lines",
             "success": False
         }), 500
 
+# "gevent" serves through gevent's WSGIServer instead of the Flask development server
+SERVER = os.environ.get("HUMANIZER_SERVER", "flask")
+# Native threads available to request handlers under the gevent server
+GEVENT_THREADS = 32
+
+def serve_gevent(host: str, port: int):
+    """
+    Serve the app with gevent's WSGIServer. Greenlets handle the
+    connections, while each handler runs on gevent's native thread pool
+    because it blocks in torch and on thread events, which would otherwise
+    stall the hub for every other connection. Since no handler code runs
+    on the hub, the standard library is left unpatched.
+
+    Args:
+        host: Interface to bind
+        port: Port to listen on
+    """
+    from gevent.pywsgi import WSGIServer
+    from gevent.threadpool import ThreadPool
+
+    pool = ThreadPool(GEVENT_THREADS)
+
+    class OffloadedBody:
+        """Response body whose chunks, e.g. streamed pipeline steps, are also produced on the pool"""
+
+        def __init__(self, body):
+            self.body = body
+            self.iterator = iter(body)
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            chunk = pool.apply(next, (self.iterator, None))
+            if chunk is None:
+                raise StopIteration
+            return chunk
+
+        def close(self):
+            if hasattr(self.body, 'close'):
+                pool.apply(self.body.close)
+
+    def threaded_app(environ, start_response):
+        return OffloadedBody(pool.apply(app, (environ, start_response)))
+
+    WSGIServer((host, port), threaded_app, log=None).serve_forever()
+
 if __name__ == '__main__':
     logger.info("Starting Humanize AI Server...")
     
     # Check if paraphrasing is available
     current_model = get_current_model()
-    logger.info(f"Paraphrasing available: {current_model is not None}")
+    logger.info("Paraphrasing available: %s", current_model is not None)
     if current_model:
-        logger.info(f"Current model: {current_model}")
-        logger.info(f"Device: {get_device_info()}")
+        logger.info("Current model: %s", current_model)
+        logger.info("Device: %s", get_device_info())
     
-    app.run(debug=False, host='0.0.0.0', port=8080)
\ No newline at end of file
+    if SERVER == "gevent":
+        logger.info("Serving with gevent WSGIServer")
+        serve_gevent('0.0.0.0', 8080)
+    else:
+        app.run(debug=False, host='0.0.0.0', port=8080, threaded=True)
\ No newline at end of file
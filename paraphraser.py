@@ -1,10 +1,28 @@
 import os
+import re
+import bisect
+import hashlib
 import logging
+import threading
 import torch
-from typing import Tuple, Optional, List
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Tuple, Optional, List
 
-# Suppress warnings
-os.environ["TORCH_DYNAMO_DISABLE"] = "1"
+# Opt in to compiling the paraphrase model at startup
+COMPILE_ENABLED = os.environ.get("HUMANIZER_COMPILE") == "1"
+WARMUP_TEXT = "This is a warmup sentence of reasonable length for the paraphraser."
+# Opt in to TorchScript-tracing the encoder whenever a model is loaded
+JIT_ENABLED = os.environ.get("HUMANIZER_JIT") == "1"
+JIT_CACHE_DIR = os.environ.get("HUMANIZER_JIT_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "humanizer", "jit"))
+# Opt in to BF16 autocast for CPU generation. oneDNN reports BF16 support on any
+# AVX512 CPU, but without native BF16 (AVX512_BF16/AMX) it's emulated and slower
+CPU_BF16_ENABLED = os.environ.get("HUMANIZER_CPU_BF16") == "1"
+
+# Suppress warnings. TorchDynamo is left enabled process-wide: the paraphrase
+# model is only compiled when HUMANIZER_COMPILE opts in, and the detector
+# compiles its CUDA models on load
 os.environ["BITSANDBYTES_NOWELCOME"] = "1"
 
 logger = logging.getLogger(__name__)
@@ -15,6 +33,39 @@ model_name = None
 device = None
 tokenizer = None
 model = None
+# Bumped whenever the loaded model changes, so callers can cache model info
+model_version = 0
+
+# Batched generation runs under BF16 autocast on CPU when HUMANIZER_CPU_BF16 opts in
+cpu_bf16 = False
+
+# Serializes generation on the shared model across request threads
+_generate_lock = threading.Lock()
+
+# Background loads started by preload_model, keyed by model name
+_preloads: Dict[str, Future] = {}
+_preloads_lock = threading.Lock()
+_preload_executor = ThreadPoolExecutor(max_workers=1)
+
+# Some models echo a leading ": " left over from the prompt prefix
+_LEADING_COLON = re.compile(r'^:\s+')
+
+def _clean_output(text: str, prefix: str) -> str:
+    """Strip whitespace, an echoed prompt prefix and a leftover leading colon from generated text"""
+    text = text.strip()
+    if prefix and text.startswith(prefix):
+        # The end is already stripped
+        text = text[len(prefix):].lstrip()
+    return _LEADING_COLON.sub('', text, count=1)
+
+# Encoder hidden states keyed by (model, token ids), so retried or repeated
+# texts skip the encoder pass
+ENCODER_CACHE_SIZE = 128
+_encoder_cache = OrderedDict()
+_encoder_cache_lock = threading.Lock()
+
+# Upper token-length bounds for batch buckets; longer inputs share the last bucket
+LENGTH_BUCKETS = [64, 128, 256, 512, 1024]
 
 # Model configurations with fallback options
 MODEL_CONFIGS = {
@@ -126,11 +177,111 @@ def get_current_model() -> Optional[str]:
     """Get currently loaded model name"""
     return model_name if current_model is not None else None
 
+def _cpu_bf16_supported() -> bool:
+    """Check whether oneDNN can run BF16 kernels on this CPU"""
+    try:
+        return torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except Exception:
+        return False
+
+def _load_weights(config: Dict, pin_memory: bool = False):
+    """
+    Load a model's tokenizer and weights onto the CPU
+
+    Args:
+        config: Model configuration from MODEL_CONFIGS
+        pin_memory: Page-lock the weights so the later device copy can be asynchronous
+
+    Returns:
+        Tuple of (tokenizer, model)
+    """
+    if config["requires_sentencepiece"]:
+        # T5 models
+        from transformers import T5Tokenizer, T5ForConditionalGeneration
+        model_tokenizer = T5Tokenizer.from_pretrained(config["model_name"])
+        model_weights = T5ForConditionalGeneration.from_pretrained(config["model_name"])
+    else:
+        # BART/Pegasus models
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+        model_tokenizer = AutoTokenizer.from_pretrained(config["model_name"])
+        model_weights = AutoModelForSeq2SeqLM.from_pretrained(config["model_name"])
+
+    if pin_memory:
+        for param in model_weights.parameters():
+            param.data = param.data.pin_memory()
+
+    return model_tokenizer, model_weights
+
+def preload_model(model_name_param: str) -> bool:
+    """
+    Start loading a model's weights in the background so a later
+    load_model call for it only has to move them to the device
+
+    Args:
+        model_name_param: Model to preload
+
+    Returns:
+        True if a preload was started
+    """
+    config = MODEL_CONFIGS.get(model_name_param)
+    if config is None or model_name_param == model_name:
+        return False
+
+    if config["requires_sentencepiece"] and not check_sentencepiece_available():
+        return False
+
+    with _preloads_lock:
+        if model_name_param in _preloads:
+            return False
+        logger.info(f"Preloading model: {model_name_param}")
+        _preloads[model_name_param] = _preload_executor.submit(
+            _load_weights, config, torch.cuda.is_available()
+        )
+    return True
+
+def cancel_preload(model_name_param: str) -> None:
+    """
+    Drop a preload that is no longer needed. One that hasn't started is
+    cancelled; a running one finishes and its weights are freed with it
+
+    Args:
+        model_name_param: Model whose preload to drop
+    """
+    with _preloads_lock:
+        preload = _preloads.pop(model_name_param, None)
+    if preload is not None:
+        preload.cancel()
+
+def fetch_model(model_name_param: str) -> bool:
+    """
+    Load a model once and discard it, so its files are in the local cache
+    and a later switch to it doesn't wait on the download
+
+    Args:
+        model_name_param: Model to fetch
+
+    Returns:
+        True if the model could be loaded
+    """
+    config = MODEL_CONFIGS.get(model_name_param)
+    if config is None:
+        return False
+
+    if config["requires_sentencepiece"] and not check_sentencepiece_available():
+        return False
+
+    try:
+        _load_weights(config)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not fetch model {model_name_param}: {str(e)}")
+        return False
+
 def load_model(model_name_param: str = None) -> Tuple[bool, Optional[str]]:
     """
     Load a paraphrasing model with proper error handling and fallbacks
     """
-    global current_model, model_name, device, tokenizer, model
+    global current_model, model_name, device, tokenizer, model, cpu_bf16, model_version
     
     try:
         # Determine which model to load
@@ -162,21 +313,19 @@ def load_model(model_name_param: str = None) -> Tuple[bool, Optional[str]]:
         
         logger.info(f"Using device: {device}")
         
-        # Load model based on type
-        if config["requires_sentencepiece"]:
-            # T5 models
-            from transformers import T5Tokenizer, T5ForConditionalGeneration, pipeline
-            tokenizer = T5Tokenizer.from_pretrained(config["model_name"])
-            model = T5ForConditionalGeneration.from_pretrained(config["model_name"])
+        # Use weights preloaded in the background if they're available
+        with _preloads_lock:
+            preload = _preloads.pop(model_name_param, None)
+        if preload is not None:
+            tokenizer, model = preload.result()
         else:
-            # BART/Pegasus models
-            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-            tokenizer = AutoTokenizer.from_pretrained(config["model_name"])
-            model = AutoModelForSeq2SeqLM.from_pretrained(config["model_name"])
-        
-        # Move model to device
-        model = model.to(device)
-        
+            tokenizer, model = _load_weights(config)
+
+        # Move model to device (pinned preloaded weights copy asynchronously)
+        model = model.to(device, non_blocking=True)
+
+        from transformers import pipeline
+
         # Create pipeline
         current_model = pipeline(
             "text2text-generation",
@@ -188,8 +337,16 @@ def load_model(model_name_param: str = None) -> Tuple[bool, Optional[str]]:
             temperature=config.get("temperature", 0.7)
         )
         
+        # FP32 unless opted in, and even then only if oneDNN has BF16 kernels
+        cpu_bf16 = device == "cpu" and CPU_BF16_ENABLED and _cpu_bf16_supported()
+        
         model_name = model_name_param
+        model_version += 1
         logger.info(f"Successfully loaded {model_name_param}")
+        
+        # Covers the startup model and auto-loads, not just /load_model
+        if JIT_ENABLED:
+            jit_compile_current()
         return True, None
         
     except Exception as e:
@@ -197,6 +354,7 @@ def load_model(model_name_param: str = None) -> Tuple[bool, Optional[str]]:
         logger.error(error_msg)
         current_model = None
         model_name = None
+        model_version += 1
         return False, error_msg
 
 def paraphrase_text(text: str, model_name_param: str = None) -> Tuple[str, Optional[str]]:
@@ -225,23 +383,18 @@ def paraphrase_text(text: str, model_name_param: str = None) -> Tuple[str, Optio
             input_text = text
         
         # Generate paraphrase
-        result = current_model(
-            input_text,
-            max_length=min(len(text.split()) * 2 + 50, config["max_length"]),
-            num_return_sequences=1,
-            do_sample=config["do_sample"],
-            temperature=config.get("temperature", 0.7),
-            num_beams=config.get("num_beams", 4)
-        )
+        with _generate_lock:
+            result = current_model(
+                input_text,
+                max_length=min(len(text.split()) * 2 + 50, config["max_length"]),
+                num_return_sequences=1,
+                do_sample=config["do_sample"],
+                temperature=config.get("temperature", 0.7),
+                num_beams=config.get("num_beams", 4)
+            )
         
         if result and len(result) > 0:
-            paraphrased = result[0]['generated_text'].strip()
-            
-            # Clean up output if it contains the prefix
-            if config["prefix"] and paraphrased.startswith(config["prefix"]):
-                paraphrased = paraphrased[len(config["prefix"]):].strip()
-            
-            return paraphrased, None
+            return _clean_output(result[0]['generated_text'], config["prefix"]), None
         else:
             return "", "No paraphrase generated"
             
@@ -250,6 +403,290 @@ def paraphrase_text(text: str, model_name_param: str = None) -> Tuple[str, Optio
         logger.error(error_msg)
         return "", error_msg
 
+def compile_model() -> Tuple[bool, Optional[str]]:
+    """
+    Compile the loaded model's forward pass with torch.compile and warm it
+    up once so the first request doesn't pay for compilation. The forward
+    is replaced in place, so both the pipeline and batched generate use it.
+
+    Returns:
+        Tuple of (success, error)
+    """
+    if model is None:
+        return False, "No model loaded"
+
+    eager_forward = model.forward
+    try:
+        mode = "reduce-overhead" if device == "cuda" else "default"
+        # dynamic=True avoids recompiling for every new input length
+        model.forward = torch.compile(eager_forward, mode=mode, dynamic=True)
+
+        _, error = paraphrase_text(WARMUP_TEXT, model_name)
+        if error:
+            raise RuntimeError(error)
+
+        logger.info(f"Compiled model: {model_name}")
+        return True, None
+
+    except Exception as e:
+        model.forward = eager_forward
+        error_msg = f"torch.compile failed for {model_name}, using eager mode: {str(e)}"
+        logger.warning(error_msg)
+        return False, error_msg
+
+class _EncoderForTrace(torch.nn.Module):
+    """Encoder with a tensor-only signature so it can be traced"""
+
+    def __init__(self, encoder):
+        super().__init__()
+        self.encoder = encoder
+
+    def forward(self, input_ids, attention_mask):
+        return self.encoder(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+class _TracedEncoder(torch.nn.Module):
+    """
+    Drop-in encoder for generate(): plain input_ids/attention_mask calls go
+    through the traced graph, anything else falls back to the eager encoder
+    """
+
+    def __init__(self, traced, eager):
+        super().__init__()
+        self.traced = traced
+        self.eager = eager
+
+    def forward(self, input_ids=None, attention_mask=None, **kwargs):
+        if (
+            input_ids is None
+            or kwargs.get("inputs_embeds") is not None
+            or kwargs.get("output_attentions")
+            or kwargs.get("output_hidden_states")
+        ):
+            return self.eager(input_ids=input_ids, attention_mask=attention_mask, **kwargs)
+
+        from transformers.modeling_outputs import BaseModelOutput
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+        return BaseModelOutput(last_hidden_state=self.traced(input_ids, attention_mask))
+
+def jit_compile_current() -> Tuple[bool, Optional[str]]:
+    """
+    Trace the loaded model's encoder with TorchScript and route generate()
+    through it. The trace is taken on a padded batch and checked against the
+    eager encoder on a differently shaped one, since _encode_ids sends padded
+    batches with attention masks. Traces are cached on disk per (model, torch
+    version, device). Takes _generate_lock so no generation sees the swap
+    half-done.
+
+    Returns:
+        Tuple of (success, error)
+    """
+    with _generate_lock:
+        if model is None or tokenizer is None:
+            return False, "No model loaded"
+
+        encoder = model.get_encoder()
+        if isinstance(encoder, _TracedEncoder):
+            return True, None
+
+        cache_key = f"{model_name}-{torch.__version__}-{device}".replace("/", "--")
+        cache_path = os.path.join(JIT_CACHE_DIR, f"{cache_key}.pt")
+
+        try:
+            def sample(texts):
+                return tokenizer(texts, padding=True, return_tensors="pt").to(device)
+
+            with torch.inference_mode():
+                if os.path.exists(cache_path):
+                    traced = torch.jit.load(cache_path, map_location=device)
+                else:
+                    # Trace with real padding so the attention mask isn't folded away
+                    trace_inputs = sample([WARMUP_TEXT, "A short one."])
+                    traced = torch.jit.trace(
+                        _EncoderForTrace(encoder).eval(),
+                        (trace_inputs["input_ids"], trace_inputs["attention_mask"]),
+                        check_trace=False
+                    )
+                    traced = torch.jit.freeze(traced) if device == "cpu" else traced
+
+                # A trace can bake in shape-dependent branches, so verify on another
+                # batch size and length; padded positions carry no meaning, skip them
+                check_inputs = sample([WARMUP_TEXT + " " + WARMUP_TEXT, "Short.", WARMUP_TEXT])
+                mask = check_inputs["attention_mask"].bool()
+                expected = encoder(**check_inputs, return_dict=True).last_hidden_state
+                actual = traced(check_inputs["input_ids"], check_inputs["attention_mask"])
+                if not torch.allclose(expected[mask], actual[mask], atol=1e-3, rtol=1e-3):
+                    raise RuntimeError("traced encoder output doesn't match eager encoder")
+
+            if not os.path.exists(cache_path):
+                os.makedirs(JIT_CACHE_DIR, exist_ok=True)
+                torch.jit.save(traced, cache_path)
+
+            traced_encoder = _TracedEncoder(traced, encoder)
+            model.get_encoder = lambda: traced_encoder
+            logger.info(f"Traced encoder for {model_name}")
+            return True, None
+
+        except Exception as e:
+            error_msg = f"TorchScript tracing failed for {model_name}, using eager encoder: {str(e)}"
+            logger.warning(error_msg)
+            return False, error_msg
+
+def _encode_ids(input_ids: List[List[int]]) -> List[torch.Tensor]:
+    """
+    Encoder hidden states for each input, unpadded. Inputs seen recently
+    with the current model are served from the encoder cache; the rest are
+    encoded together in one padded pass. Call with _generate_lock held.
+
+    Args:
+        input_ids: Unpadded token ids for each input
+
+    Returns:
+        One (seq_len, hidden) tensor per input
+    """
+    keys = [(model_name, hashlib.blake2b(array("l", ids).tobytes(), digest_size=16).digest()) for ids in input_ids]
+    states = [None] * len(input_ids)
+
+    with _encoder_cache_lock:
+        for i, key in enumerate(keys):
+            cached = _encoder_cache.get(key)
+            if cached is not None:
+                _encoder_cache.move_to_end(key)
+                states[i] = cached
+
+    missing = [i for i, state in enumerate(states) if state is None]
+    if missing:
+        batch = tokenizer.pad({"input_ids": [input_ids[i] for i in missing]}, padding="longest", return_tensors="pt").to(device)
+        hidden = model.get_encoder()(
+            input_ids=batch["input_ids"],
+            attention_mask=batch["attention_mask"],
+            return_dict=True
+        ).last_hidden_state
+
+        with _encoder_cache_lock:
+            for row, i in enumerate(missing):
+                # Clone so the cache doesn't keep the whole padded batch alive
+                states[i] = hidden[row, :len(input_ids[i])].clone()
+                _encoder_cache[keys[i]] = states[i]
+                if len(_encoder_cache) > ENCODER_CACHE_SIZE:
+                    _encoder_cache.popitem(last=False)
+
+    return states
+
+def _generate_from_states(states: List[torch.Tensor], max_words: int, config: Dict) -> List[Tuple[str, Optional[str]]]:
+    """
+    Decode paraphrases from encoder hidden states with a single generate call.
+    Call with _generate_lock held.
+
+    Args:
+        states: Unpadded encoder hidden states, one per input
+        max_words: Word count of the longest text, used for the output budget
+        config: Model configuration from MODEL_CONFIGS
+
+    Returns:
+        One (paraphrased_text, error) tuple per input
+    """
+    from transformers.modeling_outputs import BaseModelOutput
+
+    hidden = torch.nn.utils.rnn.pad_sequence(states, batch_first=True)
+    attention_mask = torch.zeros(hidden.shape[:2], dtype=torch.long, device=hidden.device)
+    for i, state in enumerate(states):
+        attention_mask[i, :state.shape[0]] = 1
+
+    outputs = model.generate(
+        encoder_outputs=BaseModelOutput(last_hidden_state=hidden),
+        attention_mask=attention_mask,
+        max_length=min(max_words * 2 + 50, config["max_length"]),
+        num_return_sequences=1,
+        do_sample=config["do_sample"],
+        temperature=config.get("temperature", 0.7),
+        num_beams=config.get("num_beams", 4)
+    )
+
+    results = []
+    for paraphrased in tokenizer.batch_decode(outputs, skip_special_tokens=True):
+        paraphrased = _clean_output(paraphrased, config["prefix"])
+        if paraphrased:
+            results.append((paraphrased, None))
+        else:
+            results.append(("", "No paraphrase generated"))
+
+    return results
+
+def _generate_bucket(input_ids: List[List[int]], max_words: int, config: Dict) -> List[Tuple[str, Optional[str]]]:
+    """
+    Run a single generate call over pre-tokenized inputs of similar length
+
+    Args:
+        input_ids: Unpadded token ids for each input
+        max_words: Word count of the longest text, used for the output budget
+        config: Model configuration from MODEL_CONFIGS
+
+    Returns:
+        One (paraphrased_text, error) tuple per input
+    """
+    with _generate_lock, torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16, enabled=cpu_bf16):
+        return _generate_from_states(_encode_ids(input_ids), max_words, config)
+
+def paraphrase_batch(texts: List[str], model_name_param: str = None) -> List[Tuple[str, Optional[str]]]:
+    """
+    Paraphrase several texts, grouping them into length buckets so each
+    generate call only pads to the longest input in its bucket
+
+    Args:
+        texts: Texts to paraphrase
+        model_name_param: Model to use, loading it if it isn't the current one
+
+    Returns:
+        One (paraphrased_text, error) tuple per input text
+    """
+    global current_model, model_name
+
+    if not texts:
+        return []
+
+    try:
+        # Load model if not loaded or different model requested
+        if current_model is None or (model_name_param and model_name_param != model_name):
+            success, error = load_model(model_name_param)
+            if not success:
+                return [("", error)] * len(texts)
+
+        if current_model is None:
+            return [("", "No model available for paraphrasing")] * len(texts)
+
+        config = MODEL_CONFIGS.get(model_name, MODEL_CONFIGS["facebook/bart-base"])
+        input_texts = [f"{config['prefix']}{text}" for text in texts]
+
+        # Tokenize once unpadded to get lengths, then pad only within each bucket
+        input_ids = tokenizer(
+            input_texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=config["max_length"]
+        )["input_ids"]
+
+        buckets = {}
+        for i, ids in enumerate(input_ids):
+            buckets.setdefault(bisect.bisect_left(LENGTH_BUCKETS, len(ids)), []).append(i)
+
+        results = [None] * len(texts)
+        for indices in buckets.values():
+            outputs = _generate_bucket(
+                [input_ids[i] for i in indices],
+                max(len(texts[i].split()) for i in indices),
+                config
+            )
+            for i, result in zip(indices, outputs):
+                results[i] = result
+
+        return results
+
+    except Exception as e:
+        error_msg = f"Error in batch paraphrasing: {str(e)}"
+        logger.error(error_msg)
+        return [("", error_msg)] * len(texts)
+
 def initialize_paraphraser():
     """Initialize the paraphraser with error handling and fallbacks"""
     try:
@@ -0,0 +1,210 @@
+import os
+import json
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The semantic tier needs both an embedding model and a vector index
+SEMANTIC_CACHE_AVAILABLE = find_spec("sentence_transformers") is not None and find_spec("faiss") is not None
+# Opt in to the semantic tier. It serves the stored output of a different but
+# near-identical input, and embeddings barely separate texts that differ only
+# in a number, name or negation, so a hit can carry the wrong facts
+SEMANTIC_CACHE_ENABLED = os.environ.get("HUMANIZER_SEMANTIC_CACHE_ENABLED") == "1"
+
+EXACT_CACHE_SIZE = 10_000
+SEMANTIC_CACHE_SIZE = 10_000
+SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.95
+# Directory the semantic tier is saved to on shutdown and reloaded from, if set
+SEMANTIC_CACHE_PATH = os.environ.get("HUMANIZER_SEMANTIC_CACHE")
+# Neighbours checked per lookup, so a close match with different options doesn't hide one that fits
+SEMANTIC_TOP_K = 4
+
+
+def _options_json(options: Dict[str, Any]) -> str:
+    return json.dumps(options, sort_keys=True, default=str)
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace so layout-only differences embed identically"""
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """Two-tier cache for pipeline responses: exact text match first, then near-duplicate text"""
+
+    def __init__(self, exact_size: int = EXACT_CACHE_SIZE, semantic: bool = SEMANTIC_CACHE_ENABLED,
+                 persist_path: Optional[str] = SEMANTIC_CACHE_PATH):
+        """
+        Args:
+            exact_size: Maximum number of entries in the exact tier
+            semantic: Enable the embedding tier when its dependencies are installed (off unless opted in)
+            persist_path: Directory to save the semantic tier to on exit and load it from
+        """
+        self.exact_size = exact_size
+        self._exact = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.semantic = semantic and SEMANTIC_CACHE_AVAILABLE
+        self._embedder = None
+        self._index = None
+        self._semantic_entries = []
+
+        self.persist_path = persist_path if self.semantic else None
+        if self.persist_path:
+            atexit.register(self.save)
+
+    @staticmethod
+    def _key(text: str, options_json: str) -> bytes:
+        # Options go first with a separator so no text/options split can collide
+        return hashlib.blake2b(f"{options_json}\0{text}".encode(), digest_size=16).digest()
+
+    def _embed(self, text: str):
+        """Embed text for the semantic tier, loading the embedder on first use"""
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None and self.semantic:
+                    try:
+                        import faiss
+                        from sentence_transformers import SentenceTransformer
+                        self._embedder = SentenceTransformer(SEMANTIC_MODEL)
+                        self._index = faiss.IndexFlatIP(self._embedder.get_sentence_embedding_dimension())
+                        self._load()
+                    except Exception as e:
+                        logger.warning(f"Semantic cache disabled: {str(e)}")
+                        self.semantic = False
+        if not self.semantic:
+            return None
+        # Normalized embeddings make inner product equal to cosine similarity
+        return self._embedder.encode([_normalize(text)], normalize_embeddings=True, convert_to_numpy=True).astype("float32")
+
+    def get(self, text: str, options: Dict[str, Any]) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Look up a cached response
+
+        Args:
+            text: Request text
+            options: Request options that affect the response
+
+        Returns:
+            Tuple of (cached_value, tier) where tier is "exact" or "semantic", or (None, None) on a miss
+        """
+        options_json = _options_json(options)
+        key = self._key(text, options_json)
+
+        with self._lock:
+            value = self._exact.get(key)
+            if value is not None:
+                self._exact.move_to_end(key)
+                return value, "exact"
+
+        if not self.semantic:
+            return None, None
+
+        embedding = self._embed(text)
+        if embedding is None:
+            return None, None
+
+        with self._lock:
+            if self._index.ntotal == 0:
+                return None, None
+            scores, ids = self._index.search(embedding, min(SEMANTIC_TOP_K, self._index.ntotal))
+
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < SEMANTIC_THRESHOLD:
+                    break
+                entry_options, value = self._semantic_entries[idx]
+                if entry_options == options_json:
+                    return value, "semantic"
+
+        return None, None
+
+    def put(self, text: str, options: Dict[str, Any], value: Any):
+        """
+        Store a response in both tiers
+
+        Args:
+            text: Request text
+            options: Request options that affect the response
+            value: Response to cache
+        """
+        options_json = _options_json(options)
+        key = self._key(text, options_json)
+
+        with self._lock:
+            self._exact[key] = value
+            self._exact.move_to_end(key)
+            if len(self._exact) > self.exact_size:
+                self._exact.popitem(last=False)
+
+        if not self.semantic:
+            return
+
+        embedding = self._embed(text)
+        if embedding is None:
+            return
+
+        with self._lock:
+            # A flat index can't drop single vectors cheaply, so start over once it's full
+            if self._index.ntotal >= SEMANTIC_CACHE_SIZE:
+                self._index.reset()
+                self._semantic_entries.clear()
+            self._index.add(embedding)
+            self._semantic_entries.append((options_json, value))
+
+    def _load(self):
+        """Restore a semantic tier saved by save(); called with the lock held"""
+        if not self.persist_path:
+            return
+        index_path = os.path.join(self.persist_path, "index.faiss")
+        entries_path = os.path.join(self.persist_path, "entries.json")
+        if not (os.path.exists(index_path) and os.path.exists(entries_path)):
+            return
+        try:
+            import faiss
+            index = faiss.read_index(index_path)
+            with open(entries_path, encoding="utf-8") as f:
+                entries = [tuple(entry) for entry in json.load(f)]
+            if index.d == self._index.d and index.ntotal == len(entries):
+                self._index = index
+                self._semantic_entries = entries
+                logger.info(f"Loaded {len(entries)} semantic cache entries")
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache: {str(e)}")
+
+    def save(self):
+        """Write the semantic tier to persist_path so it survives restarts"""
+        if not self.persist_path or self._index is None:
+            return
+        try:
+            import faiss
+            os.makedirs(self.persist_path, exist_ok=True)
+            with self._lock:
+                faiss.write_index(self._index, os.path.join(self.persist_path, "index.faiss"))
+                with open(os.path.join(self.persist_path, "entries.json"), "w", encoding="utf-8") as f:
+                    json.dump(self._semantic_entries, f)
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts for both tiers"""
+        with self._lock:
+            return {
+                "exact_entries": len(self._exact),
+                "semantic_entries": len(self._semantic_entries),
+                "semantic_enabled": self.semantic
+            }
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._exact.clear()
+            if self._index is not None:
+                self._index.reset()
+            self._semantic_entries.clear()
@@ -63,6 +63,24 @@ logger = logging.getLogger(__name__)
 # Initialize stemmer
 stemmer = SnowballStemmer('english')
 
+# Sentence splitting patterns, compiled once
+_SENT_SPLIT = re.compile(r'[.!?]+')
+_SENT_SPLIT_KEEP = re.compile(r'([.!?]+)')
+
+# Formatting fixes applied in order by _basic_refinement
+_WHITESPACE = re.compile(r'\s+')
+_FORMAT_FIXES = [
+    (re.compile(r'[\s\r\n]+([,.!?;:])'), r'\1'),  # Remove space before punctuation
+    (re.compile(r'([.!?])\s*([a-z])'), r'\1 \2'),  # Ensure space after sentence endings
+    (re.compile(r'\bi\b'), 'I'),  # Capitalize standalone 'i'
+    (re.compile(r'\s+([)\]}])'), r'\1'),  # Remove space before closing brackets
+    (re.compile(r'([(\[{])\s+'), r'\1'),  # Remove space after opening brackets
+    (re.compile(r'\s{2,}'), ' '),  # Replace multiple spaces with single space
+]
+_SPACE_BEFORE_PUNCT = re.compile(r'\s+([,.!?;:])')
+_SENTENCE_GAP = re.compile(r'([.!?])\s*([A-Z])')
+_MULTI_SPACE = re.compile(r'\s{2,}')
+
 class LocalRefinementRepository:
     """Advanced local text refinement using spaCy, TextBlob, and NLTK"""
     
@@ -215,23 +233,14 @@ class LocalRefinementRepository:
     def _basic_refinement(self, text: str) -> str:
         """Basic text refinement without external libraries"""
         # Clean up text
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = _WHITESPACE.sub(' ', text.strip())
         
         # Fix common formatting issues - MORE COMPREHENSIVE
-        replacements = {
-            r'[\s\r\n]+([,.!?;:])': r'\1',  # Remove space before punctuation
-            r'([.!?])\s*([a-z])': r'\1 \2',  # Ensure space after sentence endings
-            r'\bi\b': 'I',  # Capitalize standalone 'i'
-            r'\s+([)\]}])': r'\1',  # Remove space before closing brackets
-            r'([(\[{])\s+': r'\1',  # Remove space after opening brackets
-            r'\s{2,}': ' ',  # Replace multiple spaces with single space
-        }
-        
-        for pattern, replacement in replacements.items():
-            text = re.sub(pattern, replacement, text)
+        for pattern, replacement in _FORMAT_FIXES:
+            text = pattern.sub(replacement, text)
         
         # Ensure sentences start with capital letters
-        sentences = re.split(r'([.!?]+)', text)
+        sentences = _SENT_SPLIT_KEEP.split(text)
         result = []
         
         for i, part in enumerate(sentences):
@@ -246,15 +255,12 @@ class LocalRefinementRepository:
         # Join and apply final cleanup passes
         final_text = ''.join(result)
         
-        # Multiple cleanup passes to ensure all spacing issues are fixed
-        final_text = re.sub(r'\s+([,.!?;:])', r'\1', final_text)  # Remove spaces before punctuation
-        # Apply multiple passes to ensure no spaces are left before punctuation
-        for _ in range(2):  # Multiple passes to catch nested cases
-            final_text = re.sub(r'\s+([,.!?;:])', r'\1', final_text)
-        final_text = re.sub(r'([.!?])\s*([A-Z])', r'\1 \2', final_text)  # Ensure space after sentence endings
-        final_text = re.sub(r'\s{2,}', ' ', final_text)  # Replace multiple spaces with single space
-        final_text = re.sub(r'\s+$', '', final_text)  # Remove trailing spaces
-        final_text = re.sub(r'^\s+', '', final_text)  # Remove leading spaces
+        # One pass removes every space before punctuation: \s+ is greedy, so
+        # what's left before each mark is never whitespace
+        final_text = _SPACE_BEFORE_PUNCT.sub(r'\1', final_text)
+        final_text = _SENTENCE_GAP.sub(r'\1 \2', final_text)  # Ensure space after sentence endings
+        final_text = _MULTI_SPACE.sub(' ', final_text)  # Replace multiple spaces with single space
+        final_text = final_text.strip()  # Remove leading and trailing spaces
         
         return final_text
 
@@ -380,7 +386,7 @@ class TextRewriteService:
         try:
             return [s.strip() for s in sent_tokenize(text) if s.strip()]
         except Exception:
-            return [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+            return [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
     
     def _vary_sentence_structure(self, sentence: str) -> str:
         """Intelligently vary sentence structure"""
@@ -0,0 +1,2 @@
+# WSGI entrypoint for production servers: gunicorn wsgi:app -c gunicorn_conf.py
+from main import app